@@ -0,0 +1,114 @@
+"""Micro-benchmark: date_parsing versus the old dateutil loop.
+
+Compares, per call:
+  - parsing one date string (meta tag / JSON-LD / <time> values) with
+    dateutil.parser.parse against date_parsing.parse_date, both with a
+    cold memo cache and with repeated strings;
+  - scanning article text with the six separate re.search patterns plus
+    dateutil that extract_date() used to run, against
+    date_parsing.find_text_date's single year-anchored scan, for text
+    with a "Published:" line and for text with only a dateline.
+
+Usage: python3 code/benchmarks/bench_date_parsing.py [--number N]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dateutil.parser  # noqa: E402
+
+from scrape_news import date_parsing  # noqa: E402
+
+SAMPLE_DATES = [
+    '2025-07-04T19:36:41Z',
+    '2025-07-04T19:36:41.123+02:00',
+    '2024-03-05',
+    'Fri, 04 Jul 2025 19:36:41 GMT',
+    'March 5, 2024',
+    'Tuesday, March 5, 2024 10:30 AM',
+    '5 March 2024',
+    '03/05/2024',
+]
+
+SAMPLE_TEXT = (
+    "WASHINGTON (Reuters) - The U.S. Air Force has suspended a project to test rocket cargo "
+    "deliveries on a remote Pacific atoll after concerns were raised about the impact on "
+    "wildlife, according to officials familiar with the matter. The announcement came late on "
+    "Thursday. Published: July 4, 2025. Reporting by Jane Doe; editing by John Roe."
+) * 3
+
+DATELINE_TEXT = SAMPLE_TEXT.replace("Published: July 4, 2025.", "").replace(
+    "WASHINGTON (Reuters)", "WASHINGTON, July 4, 2025 (Reuters)")
+
+OLD_DATE_PATTERNS = [
+    r'Published:?\s*([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
+    r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
+    r'(\d{1,2}\s+[A-Za-z]+\s+\d{4})',
+    r'(\d{4}-\d{2}-\d{2})',
+    r'(\d{2}/\d{2}/\d{4})',
+    r'(\d{1,2}/\d{1,2}/\d{4})'
+]
+
+
+def old_parse_all():
+    for text in SAMPLE_DATES:
+        try:
+            dateutil.parser.parse(text)
+        except (ValueError, TypeError):
+            pass
+
+
+def new_parse_all_cold():
+    date_parsing._parse.cache_clear()
+    for text in SAMPLE_DATES:
+        date_parsing.parse_date(text)
+
+
+def new_parse_all_warm():
+    for text in SAMPLE_DATES:
+        date_parsing.parse_date(text)
+
+
+def old_text_scan(text):
+    for pattern in OLD_DATE_PATTERNS:
+        date_match = re.search(pattern, text[:1000])
+        if date_match:
+            try:
+                return dateutil.parser.parse(date_match.group(1))
+            except (ValueError, TypeError):
+                continue
+
+
+def new_text_scan_cold(text):
+    date_parsing._parse.cache_clear()
+    return date_parsing.find_text_date(text[:1000])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help="calls per measurement (default: 2000)")
+    args = parser.parse_args()
+
+    rows = [
+        ("parse 8 date strings", old_parse_all, new_parse_all_cold, "cold cache"),
+        ("parse 8 date strings", old_parse_all, new_parse_all_warm, "memoised"),
+        ("scan 'Published:' text", partial(old_text_scan, SAMPLE_TEXT),
+         partial(new_text_scan_cold, SAMPLE_TEXT), "cold cache"),
+        ("scan dateline text", partial(old_text_scan, DATELINE_TEXT),
+         partial(new_text_scan_cold, DATELINE_TEXT), "cold cache"),
+    ]
+    print(f"{'benchmark':<24}{'variant':<12}{'dateutil loop':>16}{'date_parsing':>16}{'speedup':>10}")
+    for name, old, new, variant in rows:
+        old_time = min(timeit.repeat(old, number=args.number, repeat=3)) / args.number
+        new_time = min(timeit.repeat(new, number=args.number, repeat=3)) / args.number
+        print(f"{name:<24}{variant:<12}{old_time * 1e6:>13.1f} us{new_time * 1e6:>13.1f} us"
+              f"{old_time / new_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
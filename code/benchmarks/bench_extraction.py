@@ -0,0 +1,245 @@
+"""Offline benchmark of the extraction pipeline over a corpus of saved pages.
+
+Runs every page listed in fixtures/corpus.tsv through the same steps as
+extract_article() and times each stage separately:
+
+  structured   the JSON-LD fast path, extract_structured() (it gives up
+               on pages without a complete JSON-LD article)
+  parse        newspaper's Article.set_html() + parse(), newspaper_parse()
+  metadata     document_tree() + build_metadata_index()
+  title, content, authors, date, publication
+               the fallback resolvers, always run (in production they
+               only run when newspaper's result is incomplete); title,
+               the first, includes the one walk that matches every
+               fallback selector
+  extract      the whole of extract_article(), as production runs it
+  full-parse   extract_article() without the fast path (--full-parse)
+  fetch        fetch_url() against a local HTTP server serving the
+               fixtures (only with --fetch)
+
+It reports p50/p90/p99 latency per stage, extraction throughput and the
+peak Python heap (tracemalloc) of one extraction pass, and compares them
+with a stored baseline. The corpus mixes tiny and very large pages, so
+the regression check uses each stage's per-page mean in the fastest
+round (like timeit's best of N) rather than a percentile that may fall
+between two pages or a single noisy round. The exit status is 1 if any
+figure regressed by more than --tolerance. No network access is needed.
+
+Timings are machine dependent: save a baseline on the machine that will
+run the comparison.
+
+Usage: python3 code/benchmarks/bench_extraction.py [--rounds N] [--fetch]
+                                                   [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+sys.path.insert(0, CODE_DIR)
+
+STAGES = ['structured', 'parse', 'metadata', 'title', 'content', 'authors', 'date', 'publication',
+          'extract', 'full-parse', 'fetch']
+
+
+def load_scraper():
+    """Import the scraper module of the scrape_news package in the code directory."""
+    from scrape_news import scraper
+    return scraper
+
+
+def load_corpus(fixtures_dir=FIXTURES_DIR):
+    """Return ``[(name, url, html bytes)]`` for the pages in corpus.tsv."""
+    corpus = []
+    with open(os.path.join(fixtures_dir, 'corpus.tsv'), encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            name, url = line.rstrip('\n').split('\t')
+            with open(os.path.join(fixtures_dir, name), 'rb') as page:
+                corpus.append((name, url, page.read()))
+    return corpus
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def time_stages(scraper, url, html, timings):
+    """Run one page through the stages of extract_article() and record each stage's time."""
+    def timed(stage, call, *args):
+        start = time.perf_counter()
+        value = call(*args)
+        timings[stage].append(time.perf_counter() - start)
+        return value
+
+    def index_page():
+        doc = scraper.document_tree(article)
+        return scraper.FALLBACK_SELECTORS.matcher(doc), scraper.build_metadata_index(doc)
+
+    timed('structured', scraper.extract_structured, url, html)
+    article = timed('parse', scraper.newspaper_parse, url, html)
+    selected, metadata = timed('metadata', index_page)
+    methods = {}
+    timed('title', scraper.extract_title, selected, {}, methods)
+    timed('content', scraper.extract_content, selected, {}, methods)
+    timed('authors', scraper.extract_authors, selected, metadata, article.text, {}, methods)
+    timed('date', scraper.extract_date, selected, metadata, article.text, {}, methods)
+    timed('publication', scraper.extract_publication, url, selected, metadata, {}, methods)
+    timed('extract', scraper.extract_article, url, html)
+    timed('full-parse', scraper.extract_article, url, html, False, '.', None, False)
+
+
+def serve_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Serve *fixtures_dir* on an ephemeral local port; return (server, base URL)."""
+    handler = functools.partial(_QuietHandler, directory=fixtures_dir)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(scraper, corpus, rounds, fetch=False):
+    timings = {stage: [] for stage in STAGES}
+    server = None
+    if fetch:
+        server, base_url = serve_fixtures()
+        # Benchmark the fetch path itself, not the politeness limits
+        scraper.scheduler = scraper.HostScheduler(rate=0)
+        scraper.cache = None
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm-up: imports, compiled selectors, publisher index
+        for name, url, html in corpus:
+            scraper.extract_article(url, html)
+        round_totals = {stage: [] for stage in STAGES}
+        for _ in range(rounds):
+            counts = {stage: len(values) for stage, values in timings.items()}
+            for name, url, html in corpus:
+                time_stages(scraper, url, html, timings)
+                if fetch:
+                    start = time.perf_counter()
+                    scraper.fetch_url(base_url + name)
+                    timings['fetch'].append(time.perf_counter() - start)
+            for stage, values in timings.items():
+                round_totals[stage].append(sum(values[counts[stage]:]))
+
+        # Peak memory of one full extraction pass, measured separately since tracing slows everything down
+        tracemalloc.start()
+        for name, url, html in corpus:
+            scraper.extract_article(url, html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if server:
+        server.shutdown()
+
+    results = {'stages': {}, 'pages': len(corpus), 'rounds': rounds}
+    for stage, values in timings.items():
+        if not values:
+            continue
+        values.sort()
+        results['stages'][stage] = {
+            'best_mean_ms': min(round_totals[stage]) / len(corpus) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p90_ms': percentile(values, 0.90) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+        }
+    results['pages_per_second'] = len(corpus) / min(round_totals['extract'])
+    results['peak_memory_mb'] = peak / (1024 * 1024)
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Return ``[(metric, baseline value, current value)]`` for figures worse than *tolerance* allows."""
+    worse = []
+    for stage, figures in results['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if base and figures['best_mean_ms'] > base['best_mean_ms'] * (1 + tolerance):
+            worse.append((f"{stage} mean ms", base['best_mean_ms'], figures['best_mean_ms']))
+    if 'pages_per_second' in baseline and \
+            results['pages_per_second'] < baseline['pages_per_second'] / (1 + tolerance):
+        worse.append(("pages/s", baseline['pages_per_second'], results['pages_per_second']))
+    if 'peak_memory_mb' in baseline and \
+            results['peak_memory_mb'] > baseline['peak_memory_mb'] * (1 + tolerance):
+        worse.append(("peak memory MB", baseline['peak_memory_mb'], results['peak_memory_mb']))
+    return worse
+
+
+def print_report(results, baseline):
+    base_stages = baseline.get('stages', {}) if baseline else {}
+    print(f"{results['pages']} pages x {results['rounds']} rounds")
+    print(f"{'stage':<12} {'best mean':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'baseline mean':>14} {'change':>8}")
+    for stage in STAGES:
+        figures = results['stages'].get(stage)
+        if not figures:
+            continue
+        base = base_stages.get(stage)
+        base_text = f"{base['best_mean_ms']:14.2f}" if base else f"{'-':>14}"
+        change = f"{figures['best_mean_ms'] / base['best_mean_ms'] - 1:+8.0%}" if base else f"{'':>8}"
+        print(f"{stage:<12} {figures['best_mean_ms']:9.2f} {figures['p50_ms']:9.2f} {figures['p90_ms']:9.2f} "
+              f"{figures['p99_ms']:9.2f} {base_text} {change}")
+    print(f"throughput   {results['pages_per_second']:.1f} pages/s (best round)"
+          + (f" (baseline {baseline['pages_per_second']:.1f})" if baseline else ""))
+    print(f"peak memory  {results['peak_memory_mb']:.1f} MB Python heap"
+          + (f" (baseline {baseline['peak_memory_mb']:.1f})" if baseline else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rounds', type=int, default=10, help="passes over the corpus (default: 10)")
+    parser.add_argument('--fetch', action='store_true',
+                        help="also benchmark fetch_url() against a local server serving the fixtures")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, metavar='PATH',
+                        help="stored baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run's figures as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before a figure counts as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    scraper = load_scraper()
+    results = run(scraper, load_corpus(), max(1, args.rounds), args.fetch)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if baseline:
+        worse = regressions(results, baseline, args.tolerance)
+        for metric, base, current in worse:
+            print(f"REGRESSION {metric}: {base:.2f} -> {current:.2f}")
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Start-up benchmark: how long the scraper takes to import and get going.
+
+Each scenario runs in a fresh interpreter, --rounds times:
+
+  python       an empty interpreter, for reference
+  import       import scrape_news.scraper
+  help         scrape-news.py --help
+  structured   import + extract() of a page with a complete JSON-LD
+               article (the structured-data fast path)
+  full-parse   import + extract() of a page that needs newspaper
+
+It reports the fastest and median wall time per scenario, and which of
+the heavy optional imports (newspaper, bs4, dateutil) each one loaded.
+The exit status is 1 if a scenario's fastest time regressed by more
+than --tolerance against the stored baseline, or if a scenario other
+than full-parse imported newspaper. --top N lists the slowest modules
+of ``import scrape_news.scraper`` according to ``python -X importtime``.
+
+Usage: python3 code/benchmarks/bench_import.py [--rounds N] [--top N]
+                                               [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'import-baseline.json')
+
+HEAVY_MODULES = ('newspaper', 'bs4', 'dateutil')
+
+# Each snippet runs in a fresh interpreter and ends by printing the heavy modules it loaded
+_REPORT = f"import json, sys; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+_EXTRACT = ("import scrape_news\n"
+            "with open({path!r}, 'rb') as f:\n"
+            "    scrape_news.extract(f.read(), {url!r})\n")
+_HELP = ("import runpy, sys\n"
+         "sys.argv = [{path!r}, '--help']\n"
+         "try:\n"
+         "    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+         "except SystemExit:\n"
+         "    pass\n")
+
+SCENARIOS = {
+    'python': '',
+    'import': 'import scrape_news.scraper\n',
+    'help': _HELP.format(path=os.path.join(CODE_DIR, 'scrape-news.py')),
+    'structured': _EXTRACT.format(path=os.path.join(FIXTURES_DIR, 'north-shore-jsonld-complete.html'),
+                                  url='https://www.northshoretribune.example/news/port-ellis-breakwater'),
+    'full-parse': _EXTRACT.format(path=os.path.join(FIXTURES_DIR, 'reuters-spacex-atoll.html'),
+                                  url='https://www.reuters.com/world/us/us-air-force-suspends-spacex-rocket'),
+}
+
+# Scenarios that must get by without newspaper
+NO_NEWSPAPER = ('python', 'import', 'help', 'structured')
+
+
+def run_scenario(code):
+    """Run *code* in a fresh interpreter; return (seconds, heavy modules it imported)."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', code + _REPORT], cwd=CODE_DIR,
+                               capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(rounds):
+    results = {'rounds': rounds, 'scenarios': {}}
+    for name, code in SCENARIOS.items():
+        times, loaded = [], []
+        for _ in range(rounds):
+            elapsed, loaded = run_scenario(code)
+            times.append(elapsed)
+        results['scenarios'][name] = {
+            'best_ms': min(times) * 1000,
+            'median_ms': statistics.median(times) * 1000,
+            'heavy_imports': loaded,
+        }
+    return results
+
+
+def slowest_imports(count):
+    """Return ``[(cumulative ms, module)]`` for the slowest imports of scrape_news."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import scrape_news.scraper'],
+                               cwd=CODE_DIR, capture_output=True, text=True, check=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def regressions(results, baseline, tolerance):
+    """Return ``[(metric, baseline value, current value)]`` for figures worse than *tolerance* allows."""
+    worse = []
+    for name, figures in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base and figures['best_ms'] > base['best_ms'] * (1 + tolerance):
+            worse.append((f"{name} best ms", base['best_ms'], figures['best_ms']))
+    return worse
+
+
+def print_report(results, baseline):
+    base_scenarios = baseline.get('scenarios', {}) if baseline else {}
+    print(f"{results['rounds']} fresh interpreters per scenario")
+    print(f"{'scenario':<11} {'best ms':>8} {'median ms':>10} {'baseline':>9} {'change':>8}  heavy imports")
+    for name, figures in results['scenarios'].items():
+        base = base_scenarios.get(name)
+        base_text = f"{base['best_ms']:9.1f}" if base else f"{'-':>9}"
+        change = f"{figures['best_ms'] / base['best_ms'] - 1:+8.0%}" if base else f"{'':>8}"
+        print(f"{name:<11} {figures['best_ms']:8.1f} {figures['median_ms']:10.1f} {base_text} {change}  "
+              f"{', '.join(figures['heavy_imports']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rounds', type=int, default=7, help="fresh interpreters per scenario (default: 7)")
+    parser.add_argument('--top', type=int, default=0, metavar='N',
+                        help="also list the N slowest imports of scrape_news")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, metavar='PATH',
+                        help="stored baseline to compare with (default: benchmarks/import-baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run's figures as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before a figure counts as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    results = run(max(1, args.rounds))
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.top:
+        print(f"\nslowest imports of scrape_news (cumulative ms):")
+        for milliseconds, name in slowest_imports(args.top):
+            print(f"{milliseconds:8.1f}  {name}")
+
+    eager = [name for name in NO_NEWSPAPER if 'newspaper' in results['scenarios'][name]['heavy_imports']]
+    for name in eager:
+        print(f"EAGER IMPORT {name} imported newspaper")
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 1 if eager else 0
+    worse = regressions(results, baseline, args.tolerance) if baseline else []
+    for metric, base, current in worse:
+        print(f"REGRESSION {metric}: {base:.1f} -> {current:.1f}")
+    return 1 if worse or eager else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
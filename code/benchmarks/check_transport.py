@@ -0,0 +1,130 @@
+"""Check that the HTTP transports fetch pages the way the scraper expects.
+
+Runs fetch_url() through each transport against a local HTTP server:
+
+  redirect     a 302 to the article is followed and the final URL kept
+  gzip         a gzip-encoded body is decoded by read_body(), whole and
+               with --stop-after-article
+  403 retry    a page that answers 403 until it sees the enhanced
+               headers is fetched on the second request
+
+The requests transport is always checked, the httpx transport only when
+httpx is installed (it is reported as skipped otherwise). The exit status
+is 1 if any check failed. No network access is needed.
+
+Usage: python3 code/benchmarks/check_transport.py
+"""
+import contextlib
+import gzip
+import http.server
+import importlib.util
+import io
+import os
+import sys
+import threading
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, CODE_DIR)
+
+PAGE = (b'<html><head><title>Port Ellis breakwater</title></head><body><article>'
+        + b'<p>The breakwater was finished on time.</p>' * 200
+        + b'</article><footer>' + b'<p>More news</p>' * 200 + b'</footer></body></html>')
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """/redirect -> /article (gzip), and /guarded, which wants the enhanced headers."""
+
+    def do_GET(self):
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/article')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/article':
+            body = gzip.compress(PAGE)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == '/guarded' and self.headers.get('Referer') != 'https://www.google.com/':
+            self.send_response(403)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/guarded':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve():
+    """Serve _Handler on an ephemeral local port; return (server, base URL)."""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def check(scraper, transport, base):
+    """Run the checks through *transport*; return a list of failure descriptions."""
+    failures = []
+    try:
+        scraper.session = scraper.create_session(transport=transport)
+    except ImportError as e:  # httpx without h2
+        return [str(e)]
+
+    def fetch(path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return scraper.fetch_url(base + path)
+
+    try:
+        response = fetch('/redirect')
+        if response.url != base + '/article' or response.content != PAGE:
+            failures.append(f"redirect: got {response.url} with {len(response.content)} bytes")
+        scraper.stop_after_article = True
+        try:
+            response = fetch('/article')
+        finally:
+            scraper.stop_after_article = False
+        if not PAGE.startswith(response.content) or b'</article>' not in response.content:
+            failures.append(f"gzip: --stop-after-article read {len(response.content)} of {len(PAGE)} bytes")
+        response = fetch('/guarded')
+        if response.content != PAGE:
+            failures.append(f"403 retry: got {len(response.content)} bytes")
+    except Exception as e:
+        failures.append(f"{type(e).__name__}: {e}")
+    finally:
+        scraper.session.close()
+    return failures
+
+
+def main():
+    from scrape_news import scraper
+    server, base = serve()
+    failed = False
+    try:
+        for transport in scraper.TRANSPORTS:
+            if transport == 'httpx' and importlib.util.find_spec('httpx') is None:
+                print(f"{transport:<9} skipped (httpx not installed)")
+                continue
+            failures = check(scraper, transport, base)
+            print(f"{transport:<9} {'FAILED' if failures else 'ok'}")
+            for failure in failures:
+                print(f"  {failure}")
+            failed = failed or bool(failures)
+    finally:
+        server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
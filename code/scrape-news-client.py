@@ -0,0 +1,7 @@
+"""Thin client of the scraper daemon, used by the `news` wrapper (see scrape_news/daemon.py)."""
+import sys
+
+from scrape_news.daemon import client_main
+
+if __name__ == '__main__':
+    sys.exit(client_main())
@@ -0,0 +1,21 @@
+"""News article scraper: fetch pages and extract title, authors, publication, date and text.
+
+    from scrape_news import scrape, extract
+
+    article = scrape('https://www.example.com/news/some-story')
+    article = extract(html, 'https://www.example.com/news/some-story')
+
+The scraper itself is in scraper.py and the pieces it is built from in
+the sibling modules (date_parsing, publisher_db, ...). The names below
+are loaded from scraper.py on first use, so the daemon client and the
+search tool, which only need the standard library, can import their
+modules without pulling in requests and lxml.
+"""
+__all__ = ['ArticleResult', 'ScrapeError', 'extract', 'main', 'scrape']
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import scraper
+        return getattr(scraper, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
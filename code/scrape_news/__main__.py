@@ -0,0 +1,6 @@
+"""``python3 -m scrape_news``: the same command line as scrape-news.py."""
+import sys
+
+from .scraper import main
+
+sys.exit(main())
@@ -0,0 +1,168 @@
+"""Long-running scraper daemon and its thin client.
+
+``scrape-news.py --serve`` keeps newspaper, lxml and requests imported
+and the pooled HTTP session warm, and accepts jobs on a Unix socket.
+client_main() is the client (``code/scrape-news-client.py``): it
+forwards its arguments and working directory to the daemon, streams the
+scraper's output back and exits with the job's status. Articles are written to the
+client's working directory exactly as a direct run would write them.
+
+The client only uses the standard library so that it starts in a few
+milliseconds. If no daemon is listening it runs scrape-news.py directly.
+
+Protocol: the client sends one JSON line ``{"argv", "cwd", "stdin"}``;
+the daemon answers with JSON lines ``{"out": text}`` / ``{"err": text}``
+and finally ``{"exit": status}``.
+"""
+import contextvars
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'scrape-news.sock')
+
+SCRAPER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scrape-news.py')
+
+# Where print() output of the current job goes; worker threads inherit it
+# through contextvars.copy_context() in scrape_batch()
+job_output = contextvars.ContextVar('job_output', default=None)
+
+
+class JobStdout:
+    """sys.stdout/sys.stderr replacement that routes writes to the current job's client."""
+
+    def __init__(self, console, key='out'):
+        self.console = console
+        self.key = key
+
+    def write(self, text):
+        send = job_output.get()
+        if send is None:
+            return self.console.write(text)
+        try:
+            send({self.key: text})
+        except OSError:
+            pass  # client went away; keep scraping, drop the output
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+
+        def send(message):
+            self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+        job_output.set(send)
+        try:
+            status = self.server.run_job(job['argv'], job['cwd'], job.get('stdin'))
+        except SystemExit as e:  # argparse errors and --help
+            status = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"Error: {e}")
+            print(f"Error type: {type(e).__name__}")
+            status = 1
+        finally:
+            job_output.set(None)
+        try:
+            send({'exit': status})
+        except OSError:
+            pass
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(run_job, socket_path=DEFAULT_SOCKET):
+    """Accept jobs on *socket_path* until interrupted or sent SIGTERM.
+
+    *run_job(argv, cwd, stdin)* runs one scraper invocation and returns its
+    exit status. Each connection is handled in its own thread.
+    """
+    if os.path.exists(socket_path):
+        # Refuse to steal the socket from a daemon that is still running
+        try:
+            with socket.socket(socket.AF_UNIX) as probe:
+                probe.connect(socket_path)
+            print(f"A scraper daemon is already listening on {socket_path}")
+            return 1
+        except OSError:
+            os.unlink(socket_path)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+
+    sys.stdout = JobStdout(sys.stdout)
+    sys.stderr = JobStdout(sys.stderr, 'err')
+    server = _DaemonServer(socket_path, _JobHandler)
+    server.run_job = run_job
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, _stop)
+    print(f"Scraper daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+        sys.stdout = sys.stdout.console
+        sys.stderr = sys.stderr.console
+    return 0
+
+
+def run_client(argv, socket_path=DEFAULT_SOCKET):
+    """Send *argv* to the daemon and relay its output; return the exit status.
+
+    Returns None if no daemon is listening.
+    """
+    try:
+        conn = socket.socket(socket.AF_UNIX)
+        conn.connect(socket_path)
+    except OSError:
+        return None
+    stdin = sys.stdin.read() if '-' in argv else None
+    with conn, conn.makefile('rwb') as stream:
+        job = {'argv': argv, 'cwd': os.getcwd(), 'stdin': stdin}
+        stream.write(json.dumps(job).encode('utf-8') + b'\n')
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if 'exit' in message:
+                return message['exit']
+            if 'err' in message:
+                sys.stderr.write(message['err'])
+            else:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+    print("Error: scraper daemon closed the connection")
+    return 1
+
+
+def client_main(argv=None):
+    """Run *argv* (default: the command line) in the daemon, or directly if none is listening."""
+    args = sys.argv[1:] if argv is None else list(argv)
+    status = run_client(args, os.environ.get('SCRAPE_NEWS_SOCKET', DEFAULT_SOCKET))
+    if status is None:
+        # No daemon running: fall back to a normal one-shot run
+        os.execv(sys.executable, [sys.executable, SCRAPER_PATH] + args)
+    return status
@@ -0,0 +1,197 @@
+"""Date normalisation for scrape-news.py.
+
+`parse_date` turns the date strings found in meta tags, JSON-LD, <time>
+elements and page text into timezone-aware datetimes. The formats news
+sites actually use (ISO 8601, RFC 2822, "March 5, 2024", "5 March 2024",
+"03/05/2024") are matched with precompiled patterns first; dateutil is
+only consulted (and only imported) when none of them match. Results are
+memoised, since the same strings recur across a site's pages. Dates without a timezone are
+taken to be UTC; the US newsroom forms ET, CT, MT and PT follow daylight saving time.
+
+`find_text_date` finds a date in article text in one scan for four-digit
+years instead of one full search per pattern.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# dateutil.parser once a date has needed it, False if it isn't installed
+_dateutil_parser = None
+
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9, 'oct': 10, 'october': 10,
+    'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+
+# UTC offsets (hours) of the zone abbreviations common on English-language news sites
+TZ_ABBREVIATIONS = {
+    'UTC': 0, 'GMT': 0, 'Z': 0, 'BST': 1, 'CET': 1, 'CEST': 2, 'EET': 2, 'EEST': 3,
+    'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5, 'MST': -7, 'MDT': -6, 'PST': -8, 'PDT': -7,
+    'IST': 5.5, 'JST': 9, 'AEST': 10, 'AEDT': 11,
+}
+
+# "3:04 p.m. ET": standard or daylight time, whichever was in force on the day
+US_ZONES = {'ET': 'America/New_York', 'CT': 'America/Chicago', 'MT': 'America/Denver', 'PT': 'America/Los_Angeles'}
+
+_DATEUTIL_TZINFOS = {name: int(hours * 3600) for name, hours in TZ_ABBREVIATIONS.items()}
+
+_MONTH = r'(?P<month>' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\.?'
+_TIME = (r'(?:(?:\s*,?\s*(?:at\s+)?|T)(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?'
+         r'\s*(?P<ampm>[AaPp]\.?[Mm]\.?)?)?')
+_ZONE = r'(?:\s*(?P<zone>Z|[+-]\d{2}:?\d{2}|[A-Z]{2,4}))?'
+
+ISO_8601 = re.compile(
+    r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})'
+    r'(?:[T ](?P<hour>\d{2}):(?P<minute>\d{2})(?::(?P<second>\d{2})(?:[.,](?P<fraction>\d+))?)?)?'
+    r'\s*(?P<zone>Z|[+-]\d{2}(?::?\d{2})?)?$')
+
+RFC_2822 = re.compile(r'(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+\d{2}:\d{2}')
+
+# "March 5, 2024", "Mar. 5 2024 10:30 AM EST", "Tuesday, March 5, 2024"
+MONTH_DAY_YEAR = re.compile(
+    r'(?:[A-Za-z]+,?\s+)?' + _MONTH + r'\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<year>\d{4})'
+    + _TIME + _ZONE + '$', re.IGNORECASE)
+
+# "5 March 2024", "Tue 5 Mar 2024 10:30 GMT"
+DAY_MONTH_YEAR = re.compile(
+    r'(?:[A-Za-z]+,?\s+)?(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+' + _MONTH + r',?\s+(?P<year>\d{4})'
+    + _TIME + _ZONE + '$', re.IGNORECASE)
+
+# "03/05/2024" (US month/day/year, as dateutil reads it)
+NUMERIC_US = re.compile(r'(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4})' + _TIME + _ZONE + '$')
+
+# Every date shape in article text contains a four-digit year, so text is
+# scanned once for years and only the few characters around each year are
+# checked for a full date
+YEAR = re.compile(r'(?<!\d)\d{4}(?!\d)')
+ISO_MONTH_DAY = re.compile(r'-\d{2}-\d{2}')
+DATE_BEFORE_YEAR = re.compile(
+    r'(?:\b(?P<month_name>[A-Za-z]{3,9})\.?\s+\d{1,2}(?:st|nd|rd|th)?,?'
+    r'|\b\d{1,2}\s+(?P<month_after_day>[A-Za-z]{3,9})\.?,?'
+    r'|\b\d{1,2}/\d{1,2}/)\s*$')
+
+
+def _us_zone(name):
+    try:
+        return ZoneInfo(US_ZONES[name])
+    except ZoneInfoNotFoundError:
+        # No tz database (Windows without tzdata): standard time is the best guess
+        return timezone(timedelta(hours=TZ_ABBREVIATIONS[name[0] + 'ST']))
+
+
+def _zone(value):
+    if not value or value == 'Z':
+        return timezone.utc
+    if value[0] in '+-':
+        digits = value[1:].replace(':', '')
+        minutes = int(digits[:2]) * 60 + int(digits[2:4] or 0)
+        return timezone(timedelta(minutes=-minutes if value[0] == '-' else minutes))
+    if value.upper() in US_ZONES:
+        return _us_zone(value.upper())
+    offset = TZ_ABBREVIATIONS.get(value.upper())
+    if offset is None:
+        raise ValueError(f"unknown timezone {value}")
+    return timezone(timedelta(hours=offset))
+
+
+def _from_match(match, month):
+    groups = match.groupdict()
+    hour = int(groups.get('hour') or 0)
+    ampm = (groups.get('ampm') or '').lower().replace('.', '')
+    if ampm == 'pm' and hour < 12:
+        hour += 12
+    elif ampm == 'am' and hour == 12:
+        hour = 0
+    fraction = (groups.get('fraction') or '0')[:6].ljust(6, '0')
+    return datetime(int(groups['year']), month, int(groups['day']), hour,
+                    int(groups.get('minute') or 0), int(groups.get('second') or 0),
+                    int(fraction), tzinfo=_zone(groups.get('zone')))
+
+
+def _aware(value):
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _fast_parse(text):
+    match = ISO_8601.match(text)
+    if match:
+        return _from_match(match, int(match.group('month')))
+    if RFC_2822.match(text):
+        return _aware(parsedate_to_datetime(text))
+    for pattern in (MONTH_DAY_YEAR, DAY_MONTH_YEAR):
+        match = pattern.match(text)
+        if match:
+            return _from_match(match, MONTHS[match.group('month').lower()])
+    match = NUMERIC_US.match(text)
+    if match:
+        return _from_match(match, int(match.group('month')))
+    return None
+
+
+def _load_dateutil():
+    global _dateutil_parser
+    if _dateutil_parser is None:
+        try:
+            import dateutil.parser
+            _dateutil_parser = dateutil.parser
+            _DATEUTIL_TZINFOS.update((name, _us_zone(name)) for name in US_ZONES)
+        except ImportError:
+            _dateutil_parser = False
+    return _dateutil_parser
+
+
+@lru_cache(maxsize=4096)
+def _parse(text):
+    try:
+        parsed = _fast_parse(text)
+        if parsed is not None:
+            return parsed
+    except (ValueError, TypeError, OverflowError):
+        pass
+    parser = _load_dateutil()
+    if not parser:
+        return None
+    try:
+        return _aware(parser.parse(text, tzinfos=_DATEUTIL_TZINFOS))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def parse_date(date_text):
+    """Parse *date_text* into a timezone-aware datetime, or None."""
+    if not isinstance(date_text, str):
+        return None
+    date_text = date_text.strip()
+    if not date_text or len(date_text) > 200:
+        return None
+    return _parse(date_text)
+
+
+def find_text_date(text):
+    """Return the first parseable date in *text*.
+
+    Handles "March 5, 2024", "5 March 2024", "2024-03-05" and "3/5/2024"
+    in a single pass over the text. Returns ``(datetime, matched_text)`` or
+    ``(None, None)``.
+    """
+    for year in YEAR.finditer(text):
+        start, end = year.span()
+        if ISO_MONTH_DAY.match(text, end):
+            date_text = text[start:end + 6]
+        else:
+            prefix = DATE_BEFORE_YEAR.search(text, max(0, start - 24), start)
+            if prefix is None:
+                continue
+            month = prefix.group('month_name') or prefix.group('month_after_day')
+            # Skip "page 12, 2024"-style false positives without a parse attempt
+            if month and month.lower() not in MONTHS:
+                continue
+            date_text = text[prefix.start():end]
+        parsed = parse_date(date_text)
+        if parsed is not None:
+            return parsed, date_text
+    return None, None
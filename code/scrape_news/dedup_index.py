@@ -0,0 +1,206 @@
+"""Persistent index of scraped articles for skipping duplicates.
+
+The same story tends to come in several times: with tracking parameters,
+as an AMP page, and as wire copy republished by other outlets. The index
+catches all three:
+
+- URLs are canonicalized (tracking parameters dropped, AMP variants
+  mapped to the regular page, host and query normalised) and checked
+  against the index before anything is fetched.
+- After extraction the page's rel=canonical URL is checked too, so an
+  alias that could not be recognised from the URL alone is still caught.
+  A canonical link to the site root or to another site is ignored, and a
+  match on it is confirmed against the stored text where both have a
+  sketch: some sites point every article at their homepage or a section.
+- A bottom-k MinHash sketch of the article text (the 64 smallest hashes
+  of its three-word shingles) is stored. A new article whose estimated
+  Jaccard similarity to a stored one reaches SIMILARITY_THRESHOLD is a
+  near-duplicate. Sketch values are indexed, so a lookup only compares
+  against the articles sharing a good part of the sketch.
+"""
+import hashlib
+import heapq
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .publisher_db import registrable_domain
+
+DEFAULT_DEDUP_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scrape-news', 'dedup.sqlite3')
+
+# Query parameters that only track where a click came from. Generic names such as
+# 'ref', 'cid' or 'cmp' are left alone: some sites use them to pick the content.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'gclsrc', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'ttclid', 'twclid',
+    'igshid', 'mc_cid', 'mc_eid', '_ga', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+}
+TRACKING_PREFIXES = ('utm_', 'mtm_', 'hsa_')
+
+# AMP markers in query strings: ?amp, ?amp=1, ?outputType=amp, ?output=amp
+AMP_PARAMS = {('amp', ''), ('amp', '1'), ('amp', 'true'), ('outputtype', 'amp'), ('output', 'amp')}
+_AMP_PATH_SUFFIX = re.compile(r'/amp/?$|\.amp(?=\.html?$)|\.amp$', re.IGNORECASE)
+
+SKETCH_SIZE = 64
+SIMILARITY_THRESHOLD = 0.8
+SHINGLE_WORDS = 3
+MIN_FINGERPRINT_WORDS = 50  # shorter texts are too small to compare reliably
+
+_WORD = re.compile(r'\w+')
+
+
+def canonical_url(url):
+    """Return the normalised form of *url* used as its key in the index."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    for prefix in ('www.', 'amp.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if path.startswith('/amp/'):
+        path = path[4:]
+    path = _AMP_PATH_SUFFIX.sub('', path) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+        and not name.lower().startswith(TRACKING_PREFIXES)
+        and (name.lower(), value.lower()) not in AMP_PARAMS)
+    # http and https copies of a page are the same article; the fragment never reaches the server
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def usable_canonical(key, canonical_key):
+    """Tell whether *canonical_key* can stand for the article at *key* (both canonical_url() forms).
+
+    It can unless it is the site root or on a different registrable domain.
+    """
+    canonical = urlsplit(canonical_key)
+    if canonical.path == '/' and not canonical.query:
+        return False
+    return registrable_domain(canonical.hostname or '') == registrable_domain(urlsplit(key).hostname or '')
+
+
+def minhash_sketch(text, size=SKETCH_SIZE):
+    """Return the bottom-*size* MinHash sketch of *text*'s word shingles, or None if it is too short.
+
+    The sketch is the set of the *size* smallest 64-bit shingle hashes; one
+    hash per shingle is enough, unlike classic MinHash with one hash
+    function per signature slot.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    # Signed, so the hashes fit SQLite's 64-bit integers
+    return set(heapq.nsmallest(size, (
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+        for shingle in shingles)))
+
+
+def estimated_similarity(sketch, other, size=SKETCH_SIZE):
+    """Estimate the Jaccard similarity of two texts from their sketches."""
+    union = heapq.nsmallest(size, sketch | other)
+    return sum(1 for value in union if value in sketch and value in other) / len(union)
+
+
+class DedupIndex:
+    """SQLite-backed record of scraped URLs and text fingerprints (thread-safe)."""
+
+    def __init__(self, path=DEFAULT_DEDUP_PATH, threshold=SIMILARITY_THRESHOLD):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                article TEXT NOT NULL,
+                scraped_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sketches (
+                article TEXT NOT NULL,
+                hash INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sketches_hash ON sketches (hash);
+            CREATE INDEX IF NOT EXISTS sketches_article ON sketches (article);
+        ''')
+        self._db.commit()
+
+    def new_urls(self, urls):
+        """Yield ``(url, None)`` for URLs still to scrape, ``(url, article)`` for known ones.
+
+        A URL is known when its canonical form is in the index or already
+        came earlier in *urls*; *article* is the URL it duplicates.
+        """
+        first_seen = {}
+        for url in urls:
+            key = canonical_url(url)
+            if key in first_seen:
+                yield url, first_seen[key]
+                continue
+            with self._lock:
+                row = self._db.execute('SELECT article FROM urls WHERE url = ?', (key,)).fetchone()
+            first_seen[key] = url
+            yield url, row[0] if row else None
+
+    def _sketch_of(self, article):
+        return {value for (value,) in self._db.execute('SELECT hash FROM sketches WHERE article = ?', (article,))}
+
+    def _near_duplicate(self, sketch):
+        # Articles this similar share roughly 2J/(1+J) of their sketch; ask
+        # SQLite only for those sharing at least half that
+        values = sorted(sketch)
+        min_shared = max(1, int(len(values) * self.threshold / 2))
+        candidates = self._db.execute(
+            f'SELECT article FROM sketches WHERE hash IN ({",".join("?" * len(values))}) '
+            f'GROUP BY article HAVING COUNT(*) >= ?', values + [min_shared]).fetchall()
+        for (article,) in candidates:
+            other = self._sketch_of(article)
+            if estimated_similarity(sketch, other) >= self.threshold:
+                return article
+        return None
+
+    def add(self, url, canonical_link, text):
+        """Record a freshly extracted article unless it duplicates a stored one.
+
+        *canonical_link* is the page's rel=canonical URL and *text* the
+        extracted article text. Returns the stored article it duplicates
+        (nothing is recorded then), or None once the article is recorded.
+        """
+        key = canonical_url(url)
+        article = canonical_url(canonical_link) if canonical_link else key
+        if not usable_canonical(key, article):
+            article = key
+        sketch = minhash_sketch(text)
+        with self._lock, self._db:
+            row = self._db.execute('SELECT article FROM urls WHERE url = ?', (key,)).fetchone()
+            if row:
+                return row[0]
+            if article != key:
+                row = self._db.execute('SELECT article FROM urls WHERE url = ?', (article,)).fetchone()
+                if row:
+                    other = self._sketch_of(row[0]) if sketch is not None else None
+                    if not other or estimated_similarity(sketch, other) >= self.threshold:
+                        return row[0]
+                    # Same canonical link, different text: a site-wide canonical, not this article's
+                    article = key
+            if sketch is not None:
+                duplicate = self._near_duplicate(sketch)
+                if duplicate:
+                    return duplicate
+                self._db.execute('DELETE FROM sketches WHERE article = ?', (article,))
+                self._db.executemany('INSERT INTO sketches VALUES (?, ?)',
+                                     [(article, value) for value in sketch])
+            now = time.time()
+            self._db.executemany('INSERT OR REPLACE INTO urls VALUES (?, ?, ?)',
+                                 [(url_key, article, now) for url_key in dict.fromkeys([key, article])])
+        return None
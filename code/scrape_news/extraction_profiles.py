@@ -0,0 +1,64 @@
+"""Per-domain extraction profiles for scrape-news.py.
+
+For a given site the fallback method that finds the title, content,
+authors, date or publication name almost never changes. The profile store
+remembers, per domain, which selector or method won each field last time;
+extract_article() tries that method first and only falls back to the full
+chain when it misses. Profiles are kept in a small JSON file so they carry
+over between runs.
+"""
+import json
+import os
+import threading
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scrape-news',
+                                     'extraction-profiles.json')
+
+
+def profile_domain(url_or_host):
+    """Return the profile key for a URL or host name ('www.' is ignored)."""
+    host = url_or_host.split('://', 1)[-1].split('/', 1)[0].lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class ExtractionProfiles:
+    """Thread-safe mapping of domain -> {field: winning method}, saved as JSON."""
+
+    def __init__(self, path=DEFAULT_PROFILES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._profiles = json.load(f)
+        except (OSError, ValueError):
+            self._profiles = {}
+
+    def get(self, url):
+        """Return a copy of the profile for *url*'s domain."""
+        with self._lock:
+            return dict(self._profiles.get(profile_domain(url), {}))
+
+    def record(self, url, methods):
+        """Remember the methods that won each field for *url*'s domain."""
+        if not methods:
+            return
+        with self._lock:
+            profile = self._profiles.setdefault(profile_domain(url), {})
+            for field, method in methods.items():
+                if profile.get(field) != method:
+                    profile[field] = method
+                    self._dirty = True
+
+    def save(self):
+        """Write the profiles to disk if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Write to a temporary file first so a crash can't truncate the profiles
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._profiles, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self._dirty = False
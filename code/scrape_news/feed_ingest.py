@@ -0,0 +1,312 @@
+"""Incremental RSS/Atom and sitemap ingestion for scrape-news.py.
+
+Publishers announce new articles in RSS or Atom feeds and in (news)
+sitemaps. `FeedIngester.poll()` fetches one of them and returns only the
+entries that appeared since the last poll, so a monitoring loop costs
+roughly one scrape per new article however long the feed is:
+
+- Feeds are fetched with the ETag / Last-Modified validators of the last
+  poll; an unchanged feed costs a ``304 Not Modified``.
+- Bodies are parsed with lxml's iterparse straight from the response
+  stream (gzip-compressed ``.xml.gz`` sitemaps included), and each entry
+  is discarded once read, so a 50,000-URL sitemap is never held in memory.
+- Each feed keeps a watermark: the newest entry date seen so far. Only
+  entries dated after it are returned (plus entries dated exactly at it
+  that weren't seen yet). Undated entries are remembered by URL instead.
+- In a sitemap index, only the child sitemaps whose ``<lastmod>`` is past
+  the index's watermark are fetched.
+
+Validators and watermarks are only stored by `commit()`, which the
+scraper calls after the returned URLs have been scraped; a run that dies
+halfway therefore sees the same entries again next time. URLs the
+scraper reports as worth retrying (a network error, say, but not a 404)
+are kept for retry: the next poll re-reads the
+feed without validators and returns them again while it still lists
+them. A child sitemap whose poll failed, or that left URLs to retry, is
+retried from its index the same way.
+"""
+import gzip
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import requests
+from lxml import etree
+
+from .date_parsing import parse_date
+
+DEFAULT_FEED_STATE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scrape-news', 'feeds.sqlite3')
+
+# Elements that hold one feed entry, and where the entry's date may be
+ENTRY_TAGS = {'item', 'entry', 'url', 'sitemap'}
+DATE_TAGS = ('publication_date', 'published', 'pubDate', 'date', 'issued', 'updated', 'lastmod', 'modified')
+
+# Sitemap indexes nest; don't follow them any deeper than this
+MAX_SITEMAP_DEPTH = 3
+
+
+def _localname(element):
+    return etree.QName(element).localname if isinstance(element.tag, str) else None
+
+
+def _entry_link(element, kind):
+    """Return the article URL of an entry element, or None."""
+    if kind == 'entry':  # Atom: <link rel="alternate" href="..."/>
+        for child in element:
+            if _localname(child) == 'link' and child.get('rel', 'alternate') == 'alternate' and child.get('href'):
+                return child.get('href').strip()
+        return None
+    link = guid = None
+    for child in element:
+        name = _localname(child)
+        if name in ('loc', 'link') and child.text and child.text.strip():
+            link = child.text.strip()
+        elif name == 'guid' and child.get('isPermaLink', 'true') != 'false' and child.text:
+            guid = child.text.strip()
+    link = link or guid
+    return link if link and urlparse(link).scheme in ('http', 'https') else None
+
+
+def _entry_date(element):
+    """Return the entry's publication (or modification) date, or None."""
+    found = {}
+    # iter() reaches <news:news><news:publication_date> in news sitemaps
+    for child in element.iter():
+        name = _localname(child)
+        if name in DATE_TAGS and name not in found and child.text and child.text.strip():
+            found[name] = child.text.strip()
+    for name in DATE_TAGS:
+        if name in found:
+            date = parse_date(found[name])
+            if date:
+                return date
+    return None
+
+
+def iter_entries(stream):
+    """Yield ``(kind, url, date)`` for each entry in a feed or sitemap read from *stream*.
+
+    *kind* is 'item' (RSS), 'entry' (Atom), 'url' (sitemap) or 'sitemap'
+    (a child sitemap listed in a sitemap index).
+    """
+    for _, element in etree.iterparse(stream, events=('end',), resolve_entities=False,
+                                      no_network=True, recover=False):
+        kind = _localname(element)
+        if kind not in ENTRY_TAGS:
+            continue
+        parent = element.getparent()
+        # <url> also appears inside RSS <image>; only <urlset>/<sitemapindex> children are entries
+        if kind in ('url', 'sitemap') and _localname(parent) not in ('urlset', 'sitemapindex'):
+            continue
+        url = _entry_link(element, kind)
+        if url:
+            yield kind, url, _entry_date(element)
+        # Drop what has been read so memory stays flat on huge sitemaps
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+class _FeedRecord:
+    """A feed's stored state: validators, watermark, undated URLs already seen and URLs to retry."""
+
+    def __init__(self, etag=None, last_modified=None, watermark=None, at_watermark=(), undated=(), retry=()):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.watermark = watermark
+        self.at_watermark = set(at_watermark)
+        self.undated = set(undated)
+        self.retry = set(retry)
+        # From the polls since the last commit: response validators, new entries and child sitemaps
+        self.validators = (None, None)
+        self.entries = []
+        self.children = []
+
+    def is_new(self, url, date):
+        if url in self.retry:
+            return True
+        if date is None:
+            return url not in self.undated
+        if self.watermark is None or date > self.watermark:
+            return True
+        return date == self.watermark and url not in self.at_watermark
+
+    def advance(self, url, date):
+        if date is None:
+            self.undated.add(url)
+        elif self.watermark is None or date > self.watermark:
+            self.watermark, self.at_watermark = date, {url}
+        elif date == self.watermark:
+            self.at_watermark.add(url)
+
+    def settle(self, failed, child_settled):
+        """Advance past the polled entries, keeping those that didn't make it for retry.
+
+        *failed* holds the entry URLs that couldn't be scraped and
+        *child_settled(url)* tells whether a child sitemap was read in
+        full. Returns True if nothing is left to retry.
+        """
+        children = {url for url, _ in self.children}
+        for url, date in self.entries + self.children:
+            self.advance(url, date)
+            if url in failed or (url in children and not child_settled(url)):
+                self.retry.add(url)
+            else:
+                self.retry.discard(url)
+        self.entries, self.children = [], []
+        # A 304 would hide the entries still to retry
+        self.etag, self.last_modified = (None, None) if self.retry else self.validators
+        return not self.retry
+
+
+class FeedIngester:
+    """Polls feeds and sitemaps and returns their new entries.
+
+    *session* is the requests session to fetch with, *state_path* the
+    SQLite file holding each feed's validators and watermark. Entries
+    older than *max_age* seconds (None for no limit) are skipped even on
+    a feed's first poll, so pointing it at an archive sitemap doesn't
+    queue years of articles.
+    """
+
+    def __init__(self, session, state_path=DEFAULT_FEED_STATE_PATH, max_age=None, timeout=15):
+        os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+        self.session = session
+        self.max_age = max_age
+        self.timeout = timeout
+        self._pending = {}
+        self._db = sqlite3.connect(state_path, timeout=30)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                watermark TEXT,
+                at_watermark TEXT NOT NULL,
+                undated TEXT NOT NULL,
+                polled_at REAL NOT NULL,
+                retry TEXT NOT NULL DEFAULT '[]'
+            )''')
+        if 'retry' not in [row[1] for row in self._db.execute('PRAGMA table_info(feeds)')]:
+            # State files written before failed URLs were kept for retry
+            self._db.execute("ALTER TABLE feeds ADD COLUMN retry TEXT NOT NULL DEFAULT '[]'")
+        self._db.commit()
+        self._failed = set()  # feeds whose poll failed since the last commit
+
+    def _record(self, feed_url):
+        if feed_url in self._pending:
+            return self._pending[feed_url]
+        row = self._db.execute(
+            'SELECT etag, last_modified, watermark, at_watermark, undated, retry FROM feeds WHERE url = ?',
+            (feed_url,)).fetchone()
+        if row is None:
+            return _FeedRecord()
+        etag, last_modified, watermark, at_watermark, undated, retry = row
+        return _FeedRecord(etag, last_modified, datetime.fromisoformat(watermark) if watermark else None,
+                           json.loads(at_watermark), json.loads(undated), json.loads(retry))
+
+    def poll(self, feed_url, depth=0):
+        """Fetch *feed_url* and return ``[(url, date)]`` for its entries that are new since the last poll.
+
+        Child sitemaps of a sitemap index are polled in turn and their new
+        entries included. Nothing is stored until `commit()`.
+        """
+        entries = self._poll(feed_url, depth)
+        if entries is None:
+            self._failed.add(feed_url)
+            return []
+        return entries
+
+    def _poll(self, feed_url, depth):
+        """Poll one feed; return its new entries, or None if it couldn't be fetched or read."""
+        record = self._record(feed_url)
+        conditional_headers = {}
+        if record.etag:
+            conditional_headers['If-None-Match'] = record.etag
+        if record.last_modified:
+            conditional_headers['If-Modified-Since'] = record.last_modified
+
+        try:
+            response = self.session.get(feed_url, headers=conditional_headers, timeout=self.timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            print(f"Feed {feed_url}: request failed: {e}")
+            return None
+        with response:
+            if response.status_code == 304:
+                print(f"Feed {feed_url}: not modified")
+                return []
+            if response.status_code != 200:
+                print(f"Feed {feed_url}: HTTP {response.status_code}")
+                return None
+            response.raw.decode_content = True
+            stream = response.raw
+            if urlparse(feed_url).path.endswith('.gz') and \
+                    'gzip' not in response.headers.get('Content-Encoding', ''):
+                stream = gzip.GzipFile(fileobj=stream)
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.max_age) if self.max_age else None
+            entries, children, undated, listed_retry = [], [], set(), set()
+            try:
+                for kind, url, date in iter_entries(stream):
+                    if date is None:
+                        undated.add(url)
+                    if url in record.retry:
+                        listed_retry.add(url)
+                    if not record.is_new(url, date) or (cutoff and date and date < cutoff):
+                        continue
+                    (children if kind == 'sitemap' else entries).append((url, date))
+            except (etree.XMLSyntaxError, OSError, EOFError, requests.exceptions.RequestException) as e:
+                # A partly read feed would advance the watermark past entries we never saw
+                print(f"Feed {feed_url}: could not be read: {e}")
+                return None
+            record.validators = response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+        # The watermark moves in commit(), once it's known which entries were scraped
+        record.entries.extend(entries)
+        record.children.extend(children)
+        # Only remember undated and retried entries still listed, so the state stays as small as the feed
+        record.undated &= undated
+        record.retry &= listed_retry
+        self._pending[feed_url] = record
+        print(f"Feed {feed_url}: {len(entries)} new entries"
+              + (f", {len(children)} updated sitemaps" if children else ""))
+
+        if depth < MAX_SITEMAP_DEPTH:
+            for child_url, _ in children:
+                entries.extend(self.poll(child_url, depth + 1))
+        return entries
+
+    def commit(self, failed=()):
+        """Store the validators and watermarks of every feed polled since the last commit.
+
+        *failed* holds the returned URLs that couldn't be scraped but are
+        worth retrying; the next poll returns them again.
+        """
+        settled = {}
+
+        def child_settled(feed_url):
+            if feed_url not in settled:
+                settled[feed_url] = True  # in case an index lists itself
+                record = self._pending.get(feed_url)
+                settled[feed_url] = feed_url not in self._failed and (
+                    record is None or record.settle(failed, child_settled))
+            return settled[feed_url]
+
+        for feed_url in list(self._pending):
+            child_settled(feed_url)
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(feed_url, record.etag, record.last_modified,
+                  record.watermark.isoformat() if record.watermark else None,
+                  json.dumps(sorted(record.at_watermark)), json.dumps(sorted(record.undated)), now,
+                  json.dumps(sorted(record.retry)))
+                 for feed_url, record in self._pending.items()])
+        self._pending = {}
+        self._failed = set()
+
+    def close(self):
+        self._db.close()
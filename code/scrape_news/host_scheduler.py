@@ -0,0 +1,176 @@
+"""Per-host request scheduling for scrape-news.py.
+
+Each host gets a token bucket that limits how fast requests to it start,
+an exponential backoff (with jitter) after failed attempts, and a circuit
+breaker. A ``Retry-After`` header on a 429/503 sets the backoff instead of
+the exponential schedule. The breaker is tripped when a bot wall (DataDome,
+Cloudflare) answers; while it is open, further requests to that host fail
+immediately instead of burning retries. After the cooldown the breaker
+is half-open: one request is let through to probe whether the wall is
+still up. Batch runs hold the host's other URLs back while the probe is
+out (see `probe_pending()`); they go ahead once it succeeds and fail if
+it trips the breaker again. A probe that never reports back is given up
+after another cooldown.
+
+The scheduler never sleeps itself: `reserve()` and `failure()` return how
+long the caller should wait, so batch runs can work on other hosts in the
+meantime.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Longest Retry-After we honour; anything longer is treated as this
+MAX_RETRY_AFTER = 600
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds asked for by a Retry-After header, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return min(max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()), MAX_RETRY_AFTER)
+
+
+class _HostState:
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.not_before = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.blocked_by = None
+        self.probe = None  # the URL probing a half-open breaker
+
+
+class HostScheduler:
+    """Thread-safe token buckets, backoff and circuit breakers, one set per host.
+
+    *rate* is the number of requests per second that may start for one
+    host (0 for no limit) and *burst* how many may start at once after an
+    idle period. Backoff starts at *backoff_base* seconds, doubles with
+    each consecutive failure up to *backoff_cap*, and is randomised
+    between half and all of that. An open breaker stays open for
+    *breaker_cooldown* seconds.
+    """
+
+    def __init__(self, rate=4.0, burst=4, backoff_base=2.0, backoff_cap=60.0, breaker_cooldown=300.0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker_cooldown = breaker_cooldown
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.burst)
+        return state
+
+    def blocked(self, host, probe=None):
+        """Return what blocks *host* (e.g. 'DataDome') while its breaker is open, else None.
+
+        Once the cooldown is over, None is returned until a caller passes
+        the URL it is about to request as *probe*: that URL is the probe,
+        and the breaker stays open to every other URL until `success()`
+        closes it, `trip()` reopens it, `release_probe()` gives the probe
+        up or another cooldown passes.
+        """
+        with self._lock:
+            state = self._state(host)
+            if not state.blocked_by:
+                return None
+            now = time.monotonic()
+            if now < state.open_until:
+                return None if probe is not None and probe == state.probe else state.blocked_by
+            if probe is not None:
+                state.probe = probe
+                state.open_until = now + self.breaker_cooldown
+            return None
+
+    def probe_pending(self, host, url=None):
+        """Return how long *host*'s probe (if it isn't *url*) may still take, else 0.
+
+        While it is out the host's other URLs should wait rather than fail.
+        """
+        with self._lock:
+            state = self._state(host)
+            if not state.blocked_by or state.probe is None or state.probe == url:
+                return 0.0
+            return max(0.0, state.open_until - time.monotonic())
+
+    def release_probe(self, host, url):
+        """Give up *url* as *host*'s probe without a verdict, so the next request probes instead."""
+        with self._lock:
+            state = self._state(host)
+            if state.probe == url:
+                state.probe = None
+                state.open_until = time.monotonic()
+
+    def reserve(self, host):
+        """Take a request slot for *host*.
+
+        Returns 0 if a request may start now, otherwise the number of
+        seconds to wait before asking again (no slot is taken then).
+        """
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if now < state.not_before:
+                return state.not_before - now
+            if self.rate <= 0:
+                return 0.0
+            state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                return 0.0
+            return (1 - state.tokens) / self.rate
+
+    def failure(self, host, retry_after=None):
+        """Back *host* off after a failed attempt; return the delay in seconds.
+
+        *retry_after* (seconds, from a Retry-After header) is used as the
+        delay when given; otherwise the delay grows exponentially with the
+        number of consecutive failures.
+        """
+        with self._lock:
+            state = self._state(host)
+            state.failures += 1
+            if retry_after is None:
+                delay = min(self.backoff_cap, self.backoff_base * 2 ** (state.failures - 1))
+                delay *= random.uniform(0.5, 1.0)
+            else:
+                delay = retry_after
+            state.not_before = max(state.not_before, time.monotonic() + delay)
+            return delay
+
+    def success(self, host):
+        """Reset *host*'s backoff, and close its breaker, after a successful request."""
+        with self._lock:
+            state = self._state(host)
+            state.failures = 0
+            state.not_before = 0.0
+            state.blocked_by = None
+            state.probe = None
+
+    def trip(self, host, blocked_by):
+        """Open *host*'s circuit breaker because *blocked_by* (e.g. 'Cloudflare') walled us off."""
+        with self._lock:
+            state = self._state(host)
+            state.blocked_by = blocked_by
+            state.probe = None
+            state.open_until = time.monotonic() + self.breaker_cooldown
@@ -0,0 +1,151 @@
+"""Timing spans and counters for scrape-news.py.
+
+A Metrics object collects:
+
+- spans: how long each stage (fetch, parse, the field resolvers, save,
+  ...) took, per call, with the URL it was working on;
+- counters with labels: HTTP statuses, retries, circuit breaker trips,
+  cache hits, fallback hits per field and method, bytes downloaded and
+  articles by outcome.
+
+Spans are written as JSON lines (one object per span, buffered and
+appended in batches), and the totals can be written as a Prometheus
+textfile for node_exporter's textfile collector. Extraction worker
+processes collect into their own Metrics and ship a `snapshot()` back
+with their result, which the parent `merge()`s.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+PROMETHEUS_PREFIX = 'scrape_news'
+
+
+class Metrics:
+    """Thread-safe collector of stage timings and labelled counters.
+
+    *events_path* receives one JSON line per span, *prometheus_path* the
+    totals in Prometheus text format; both are written by `flush()`.
+    Without either, everything is only kept in memory (as in worker
+    processes).
+    """
+
+    def __init__(self, events_path=None, prometheus_path=None, batch_size=500):
+        self.events_path = events_path
+        self.prometheus_path = prometheus_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stages = {}    # stage -> [calls, total seconds, max seconds]
+        self._counters = {}  # (name, ((label, value), ...)) -> total
+        self._events = []
+
+    @contextlib.contextmanager
+    def span(self, stage, url=None):
+        """Time the enclosed block as one call of *stage*."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, url)
+
+    def record(self, stage, seconds, url=None):
+        """Record one call of *stage* that took *seconds*."""
+        event = {'ts': round(time.time(), 3), 'stage': stage, 'seconds': round(seconds, 6)}
+        if url:
+            event['url'] = url
+        with self._lock:
+            self._add_stage(stage, 1, seconds, seconds)
+            self._events.append(event)
+            if self.events_path and len(self._events) >= self.batch_size:
+                self._write_events()
+
+    def count(self, name, value=1, **labels):
+        """Add *value* to counter *name* with *labels* (e.g. ``status=200``)."""
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _add_stage(self, stage, calls, seconds, longest):
+        totals = self._stages.setdefault(stage, [0, 0.0, 0.0])
+        totals[0] += calls
+        totals[1] += seconds
+        totals[2] = max(totals[2], longest)
+
+    def snapshot(self):
+        """Return and clear everything collected so far, in a picklable form."""
+        with self._lock:
+            snapshot = {
+                'stages': self._stages,
+                'counters': [(name, list(labels), value) for (name, labels), value in self._counters.items()],
+                'events': self._events,
+            }
+            self._stages, self._counters, self._events = {}, {}, []
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add a snapshot() taken in another process."""
+        with self._lock:
+            for stage, (calls, seconds, longest) in snapshot['stages'].items():
+                self._add_stage(stage, calls, seconds, longest)
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(label) for label in labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            self._events.extend(snapshot['events'])
+
+    def summary(self):
+        """Return the stage totals and counters as a plain dict."""
+        with self._lock:
+            return {
+                'stages': {stage: {'calls': calls, 'seconds': round(seconds, 6), 'max_seconds': round(longest, 6)}
+                           for stage, (calls, seconds, longest) in sorted(self._stages.items())},
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self._counters.items())],
+            }
+
+    def _write_events(self):
+        with open(self.events_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event) + '\n' for event in self._events))
+        self._events = []
+
+    def flush(self):
+        """Write pending span events and rewrite the Prometheus textfile."""
+        with self._lock:
+            if self.events_path and self._events:
+                self._write_events()
+            elif not self.events_path:
+                self._events = []
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+
+    def prometheus_text(self):
+        """Return the totals in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            stage_metric = f'{PROMETHEUS_PREFIX}_stage_seconds'
+            lines.append(f'# HELP {stage_metric} Time spent in each scraping stage.')
+            lines.append(f'# TYPE {stage_metric} summary')
+            for stage, (calls, seconds, _) in sorted(self._stages.items()):
+                lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {seconds:.6f}')
+                lines.append(f'{stage_metric}_count{{stage="{stage}"}} {calls}')
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f'{PROMETHEUS_PREFIX}_{name}_total'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                label_text = ','.join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+                lines.append(f'{metric}{{{label_text}}} {value}' if label_text else f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() to *path* atomically, as the textfile collector expects."""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
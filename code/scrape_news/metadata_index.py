@@ -0,0 +1,153 @@
+"""One-pass index of a page's structured metadata.
+
+`build_metadata_index` walks the parsed document once, collecting every
+``<meta>`` tag, every ``<time datetime>`` value and every JSON-LD block
+(including arrays and nested ``@graph`` documents). The date, author and
+publication resolvers in scrape-news.py then look fields up in the index
+instead of searching the whole document once per candidate.
+
+`build_json_ld_index` builds the same index from the JSON-LD blocks
+alone, found with a byte-level scan of the raw page, for when the
+structured data may be all that is needed and the page need not be
+parsed at all.
+"""
+import json
+import re
+
+# Attributes that name a <meta> tag
+META_KEY_ATTRIBUTES = ('property', 'name', 'itemprop')
+
+# JSON-LD fields kept in the index
+JSON_LD_FIELDS = ('headline', 'datePublished', 'dateModified', 'author', 'publisher',
+                  'organization', 'articleBody', 'name', 'url', 'mainEntityOfPage')
+
+_JSON_LD_SCRIPT = re.compile(
+    rb'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL)
+
+
+def _is_article_type(node):
+    types = node.get('@type', ())
+    if isinstance(types, str):
+        types = (types,)
+    return any(isinstance(t, str) and (t.endswith('Article') or t == 'BlogPosting')
+               for t in types)
+
+
+class MetadataIndex:
+    """Keyed view of a page's <meta>, <time> and JSON-LD metadata."""
+
+    def __init__(self):
+        self.meta_tags = {}
+        self.times = []
+        self.json_ld_nodes = []
+        self.json_ld_fields = {}
+        self._nodes_by_id = {}
+
+    def meta(self, attrs):
+        """Return the content of the first <meta> matching *attrs*, e.g.
+        ``{'property': 'og:site_name'}``, or None."""
+        (attr, value), = attrs.items()
+        return self.meta_tags.get((attr, value.lower()))
+
+    def json_ld(self, field):
+        """Return the first value of *field* across all JSON-LD documents.
+
+        Article-typed nodes (NewsArticle, BlogPosting, ...) take precedence
+        over WebPage/Organization nodes, and ``{"@id": ...}`` references
+        are resolved against the other nodes on the page.
+        """
+        return self.resolve(self.json_ld_fields.get(field))
+
+    def json_ld_names(self, field):
+        """Return the names in a person/organization *field* as a list.
+
+        Handles plain strings, ``{"name": ...}`` objects, ``@id``
+        references and lists of any of those.
+        """
+        value = self.json_ld(field)
+        values = value if isinstance(value, list) else [value]
+        names = []
+        for item in values:
+            item = self.resolve(item)
+            if isinstance(item, dict):
+                item = item.get('name')
+            if isinstance(item, str) and item.strip():
+                names.append(item.strip())
+        return names
+
+    def article_node(self):
+        """Return the first article-typed JSON-LD node (NewsArticle, BlogPosting, ...), or None."""
+        for node in self.json_ld_nodes:
+            if _is_article_type(node):
+                return node
+        return None
+
+    def resolve(self, value):
+        """Replace a bare ``{"@id": ...}`` reference with the node it names."""
+        if isinstance(value, dict) and set(value) == {'@id'}:
+            return self._nodes_by_id.get(value['@id'], value)
+        return value
+
+    def _add_json_ld(self, data):
+        # Arrays and @graph containers hold further documents
+        if isinstance(data, list):
+            for item in data:
+                self._add_json_ld(item)
+            return
+        if not isinstance(data, dict):
+            return
+        if '@graph' in data:
+            self._add_json_ld(data['@graph'])
+        self.json_ld_nodes.append(data)
+        if isinstance(data.get('@id'), str):
+            self._nodes_by_id.setdefault(data['@id'], data)
+
+    def _index_json_ld_fields(self):
+        ordered = sorted(self.json_ld_nodes, key=lambda node: not _is_article_type(node))
+        for node in ordered:
+            for field in JSON_LD_FIELDS:
+                if node.get(field) and field not in self.json_ld_fields:
+                    self.json_ld_fields[field] = node[field]
+
+
+def build_metadata_index(doc):
+    """Build a MetadataIndex from an lxml document in a single tree walk."""
+    index = MetadataIndex()
+    for elem in doc.iter('meta', 'time', 'script'):
+        if elem.tag == 'meta':
+            content = (elem.get('content') or '').strip()
+            if not content:
+                continue
+            for attr in META_KEY_ATTRIBUTES:
+                key = elem.get(attr)
+                if key:
+                    index.meta_tags.setdefault((attr, key.lower()), content)
+        elif elem.tag == 'time':
+            if elem.get('datetime'):
+                index.times.append(elem.get('datetime'))
+        elif (elem.get('type') or '').lower() == 'application/ld+json':
+            try:
+                index._add_json_ld(json.loads(elem.text_content()))
+            except json.JSONDecodeError:
+                continue
+    index._index_json_ld_fields()
+    return index
+
+
+def build_json_ld_index(html):
+    """Build a MetadataIndex of the JSON-LD blocks in *html* (bytes) without parsing the page.
+
+    Only the JSON-LD fields are filled in; the <meta> and <time> parts of
+    the index stay empty.
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    index = MetadataIndex()
+    for match in _JSON_LD_SCRIPT.finditer(html):
+        try:
+            index._add_json_ld(json.loads(match.group(1)))
+        except ValueError:  # also covers undecodable bytes
+            continue
+    index._index_json_ld_fields()
+    return index
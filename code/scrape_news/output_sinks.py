@@ -0,0 +1,218 @@
+"""Output sinks for scraped articles.
+
+Every sink takes the same article record (url, domain, title, authors,
+publication, publish_date, text) and returns a short description of
+where it went:
+
+- ``txt``: one ``<title>.txt`` file per article, the original format.
+  Different articles with the same headline get ``<title> (2).txt`` and so
+  on instead of overwriting each other; re-scraping the same URL still
+  replaces its file.
+- ``jsonl``: one JSON object per line, appended to a single file.
+- ``sqlite``: an ``articles`` table keyed by url, with indexes on domain
+  and publish_date. Re-scraping a URL replaces its row.
+- ``search``: a full-text search index (see search_index.py), queried with
+  ``python3 code/search-news.py``. Re-scraping a URL replaces its entry.
+
+The JSONL, SQLite and search sinks buffer records and write them in batches, so
+a large run costs a few writes and commits instead of one file per
+article. Call ``close()`` to flush the last batch.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from .search_index import DEFAULT_INDEX_PATH, SearchIndex
+
+SINK_FORMATS = ('txt', 'jsonl', 'sqlite', 'search')
+DEFAULT_PATHS = {'jsonl': 'articles.jsonl', 'sqlite': 'articles.sqlite3', 'search': DEFAULT_INDEX_PATH}
+
+
+def article_record(result):
+    """Turn an extract_article() ArticleResult into the record every sink stores.
+
+    publish_date is kept as extracted (usually a datetime); the txt sink writes
+    it as before and the structured sinks store it as ISO 8601.
+    """
+    host = (urlparse(result.url).hostname or '').lower()
+    return {
+        'url': result.url,
+        'domain': host[4:] if host.startswith('www.') else host,
+        'title': result.title,
+        'authors': list(result.authors),
+        'publication': result.publication,
+        'publish_date': result.publish_date,
+        'text': result.text,
+    }
+
+
+def _iso_dates(record):
+    """Return *record* with its publish_date as an ISO 8601 string, for the structured sinks."""
+    publish_date = record['publish_date']
+    if hasattr(publish_date, 'isoformat'):
+        return dict(record, publish_date=publish_date.isoformat())
+    return record
+
+
+class TextSink:
+    """One plain text file per article in *output_dir*."""
+
+    def __init__(self, output_dir='.'):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._claimed = {}  # file name -> URL, for the names handed out in this run
+
+    def _owner(self, filename):
+        """Return the URL stored in an existing article file (its last line), or None."""
+        try:
+            with open(os.path.join(self.output_dir, filename), 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                return f.read().decode('utf-8', 'replace').rsplit('\n', 1)[-1]
+        except OSError:
+            return None
+
+    def _filename(self, title, url):
+        base = title.replace('/', '_').replace('\\', '_') if title else 'untitled_article'
+        base = base[:100]  # Limit filename length
+        filename, number = base + '.txt', 2
+        with self._lock:
+            while True:
+                owner = self._claimed.get(filename) or self._owner(filename)
+                if owner is None or owner == url:
+                    break
+                filename = f"{base} ({number}).txt"
+                number += 1
+            self._claimed[filename] = url
+        return filename
+
+    def write(self, record):
+        title = record['title']
+        filename = self._filename(title, record['url'])
+        with open(os.path.join(self.output_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(f"{title}\n\n")
+            f.write(f"{', '.join(record['authors']) if record['authors'] else 'Unknown'}\n\n")
+            f.write(f"{record['publication'] or 'Unknown'}\n\n")
+            f.write(f"{record['publish_date']}\n\n")
+            f.write(f"{record['text']}\n\n")
+            f.write(f"{record['url']}")
+        return filename
+
+    def close(self):
+        pass
+
+
+class _BatchedSink:
+    """Buffers records and hands them to ``_write_batch`` *batch_size* at a time."""
+
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._batch = []
+
+    def write(self, record):
+        with self._lock:
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+        return self.path
+
+    def _flush(self):
+        if self._batch:
+            self._write_batch(self._batch)
+            self._batch = []
+
+    def close(self):
+        with self._lock:
+            self._flush()
+
+
+class JsonlSink(_BatchedSink):
+    """Append-only JSON Lines file, one article per line."""
+
+    def _write_batch(self, records):
+        lines = ''.join(json.dumps(_iso_dates(record), ensure_ascii=False) + '\n'
+                        for record in records)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class SqliteSink(_BatchedSink):
+    """SQLite ``articles`` table with indexed url, domain and publish_date columns."""
+
+    def __init__(self, path, batch_size=100):
+        super().__init__(path, batch_size)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                title TEXT,
+                authors TEXT NOT NULL,
+                publication TEXT,
+                publish_date TEXT,
+                text TEXT NOT NULL,
+                scraped_at REAL NOT NULL
+            )''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS articles_domain ON articles (domain)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS articles_publish_date ON articles (publish_date)')
+        self._db.commit()
+
+    def _write_batch(self, records):
+        now = time.time()
+        with self._db:  # one transaction per batch
+            self._db.executemany(
+                'INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(record['url'], record['domain'], record['title'], json.dumps(record['authors']),
+                  record['publication'], record['publish_date'], record['text'], now)
+                 for record in map(_iso_dates, records)])
+
+    def close(self):
+        super().close()
+        self._db.close()
+
+
+class SearchSink(_BatchedSink):
+    """Full-text search index (SQLite FTS5) over title, authors, publication, text and URL."""
+
+    def __init__(self, path, batch_size=100):
+        super().__init__(path, batch_size)
+        self._index = SearchIndex(path)
+
+    def _write_batch(self, records):
+        self._index.add([_iso_dates(record) for record in records])
+
+    def close(self):
+        super().close()
+        self._index.close()
+
+
+def parse_sink_spec(spec):
+    """Split an ``--output`` value such as 'txt', 'jsonl' or 'sqlite:news.db' into (format, path)."""
+    sink_format, _, path = spec.partition(':')
+    sink_format = sink_format.strip().lower()
+    if sink_format not in SINK_FORMATS:
+        raise ValueError(f"unknown output format {sink_format!r} (choose from {', '.join(SINK_FORMATS)})")
+    if sink_format == 'txt' and path:
+        raise ValueError("the txt output is written to the working directory and takes no path")
+    return sink_format, path or DEFAULT_PATHS.get(sink_format)
+
+
+def open_sinks(specs, output_dir='.'):
+    """Open a sink for each ``(format, path)`` in *specs*; paths are relative to *output_dir*."""
+    sinks = []
+    for sink_format, path in specs:
+        if sink_format == 'txt':
+            sinks.append(TextSink(output_dir))
+        elif sink_format == 'jsonl':
+            sinks.append(JsonlSink(os.path.join(output_dir, path)))
+        elif sink_format == 'search':
+            sinks.append(SearchSink(os.path.join(output_dir, path)))
+        else:
+            sinks.append(SqliteSink(os.path.join(output_dir, path)))
+    return sinks
@@ -0,0 +1,112 @@
+"""Publisher lookup by host name for scrape-news.py.
+
+Outlets live in ``data/publishers.tsv`` (domain, tab, publication name).
+The file is loaded on first use into a suffix index keyed by the domain's
+reversed labels ("com.cnn", "uk.co.bbc"); a host is resolved by trying
+its suffixes from most to least specific, so a lookup costs one dict probe
+per label and ``edition.cnn.com`` finds ``cnn.com`` while ``notime.com``
+does not match ``time.com``. The parsed index is cached with marshal
+next to the other scraper caches and rebuilt when the data file changes.
+
+Hosts that are not in the database get a name derived from their
+registrable domain, using the public suffix list bundled with tldextract
+(news.example.co.uk -> "Example").
+"""
+import marshal
+import os
+
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'publishers.tsv')
+INDEX_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'scrape-news')
+
+_index = None
+_suffix_extractor = None
+
+
+def _reversed_key(host):
+    return '.'.join(reversed(host.split('.')))
+
+
+def _load_index(path=DEFAULT_DATABASE):
+    """Return the suffix index for *path*, using the marshal cache if it is current."""
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cache_path = os.path.join(INDEX_CACHE_DIR, 'publishers.index')
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_stamp, index = marshal.load(f)
+        if tuple(cached_stamp) == stamp:
+            return index
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    index = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            domain, _, name = line.rstrip('\n').partition('\t')
+            if name:
+                index[_reversed_key(domain.strip().lower())] = name.strip()
+
+    try:
+        os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            marshal.dump((stamp, index), f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # the cache is only an optimisation
+    return index
+
+
+def lookup_publisher(host):
+    """Return the publication name for *host* (or any parent domain), or None."""
+    global _index
+    if _index is None:
+        _index = _load_index()
+    labels = host.lower().rstrip('.').split('.')
+    if labels[0] == 'www':
+        labels = labels[1:]
+    # Most specific suffix first: abcnews.go.com before go.com
+    for start in range(len(labels) - 1):
+        name = _index.get('.'.join(reversed(labels[start:])))
+        if name:
+            return name
+    return None
+
+
+def _split_registrable(host):
+    """Return ``(domain label, public suffix)`` of *host*, e.g. ('example', 'co.uk')."""
+    global _suffix_extractor
+    try:
+        if _suffix_extractor is None:
+            import tldextract
+            # Use the bundled public suffix list; never download it
+            _suffix_extractor = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None,
+                                                      include_psl_private_domains=True)
+        extracted = _suffix_extractor(host)
+        return extracted.domain, extracted.suffix
+    except ImportError:
+        # Without tldextract, strip a few common suffixes by hand
+        name = host[4:] if host.startswith('www.') else host
+        for tld in ['.com', '.org', '.net', '.co.uk', '.gov']:
+            if name.endswith(tld):
+                return name[:-len(tld)].split('.')[-1], tld[1:]
+        return name.split('.')[0], ''
+
+
+def registrable_domain(host):
+    """Return *host*'s registrable domain, e.g. 'news.example.co.uk' -> 'example.co.uk'.
+
+    Hosts without a known public suffix (IP addresses, 'localhost') are
+    returned as they are.
+    """
+    host = host.lower().rstrip('.')
+    domain, suffix = _split_registrable(host)
+    return f"{domain}.{suffix}" if domain and suffix else host
+
+
+def registrable_name(host):
+    """Turn *host*'s registrable domain into a readable name, e.g. 'new-york-post.co.uk' -> 'New York Post'."""
+    name, _ = _split_registrable(host.lower().rstrip('.'))
+    return name.replace('-', ' ').replace('_', ' ').title() if name else None
@@ -0,0 +1,147 @@
+"""Archive of fetched pages in WARC format, for re-extraction without the network.
+
+`ResponseArchive` appends each successful response as a WARC/1.1
+``response`` record: the WARC headers, then the HTTP status line, the
+headers and the body. Every record is compressed as its own gzip member,
+the usual ``.warc.gz`` layout, so appending never rewrites the file and
+the result can be read by standard WARC tools. Bodies are stored as they
+were decoded (gzip/deflate removed), so Content-Encoding is dropped and
+Content-Length rewritten. A body cut short by the download limits is
+marked with a ``WARC-Truncated`` header.
+
+`iter_archive` streams the records back one at a time; `iter_latest`
+keeps only the newest response for each URL.
+"""
+import base64
+import gzip
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_ARCHIVE_PATH = 'responses.warc.gz'
+
+# Response headers that describe the transfer rather than the stored body
+TRANSFER_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+class ArchivedResponse:
+    """One archived response: the URL, when it was fetched, the HTTP status, headers and body."""
+
+    def __init__(self, url, date, status, headers, body, truncated=None):
+        self.url = url
+        self.date = date
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.truncated = truncated
+
+
+class ResponseArchive:
+    """Thread-safe appender of WARC response records to a (gzip-compressed) file."""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self._compress = not path.endswith('.warc')
+
+    def append(self, url, response, body, truncated=None):
+        """Archive *response* for *url*, whose (decoded) body is *body*.
+
+        *truncated* is the WARC-Truncated reason ('length', 'unspecified',
+        ...) when the download limits cut the body short.
+        """
+        status_line = f"HTTP/1.1 {response.status_code} {response.reason or ''}".rstrip()
+        header_lines = [f"{name}: {value}" for name, value in response.headers.items()
+                        if name.lower() not in TRANSFER_HEADERS]
+        header_lines.append(f"Content-Length: {len(body)}")
+        block = ('\r\n'.join([status_line] + header_lines) + '\r\n\r\n').encode('latin-1', 'replace') + body
+
+        warc_headers = [
+            'WARC/1.1',
+            'WARC-Type: response',
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+            f"WARC-Target-URI: {url}",
+            f"WARC-Payload-Digest: sha1:{base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')}",
+        ]
+        if truncated:
+            warc_headers.append(f"WARC-Truncated: {truncated}")
+        warc_headers += ['Content-Type: application/http;msgtype=response', f"Content-Length: {len(block)}"]
+        record = ('\r\n'.join(warc_headers) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+        if self._compress:
+            record = gzip.compress(record, compresslevel=6)
+        with self._lock:
+            self._file.write(record)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _read_headers(stream):
+    """Read header lines up to the blank line; return (first line, headers), or (None, None) at the end."""
+    first = stream.readline()
+    while first in (b'\r\n', b'\n'):  # padding between records
+        first = stream.readline()
+    if not first:
+        return None, None
+    headers = CaseInsensitiveDict()
+    for line in iter(stream.readline, b''):
+        line = line.rstrip(b'\r\n')
+        if not line:
+            break
+        name, _, value = line.decode('utf-8', 'replace').partition(':')
+        headers[name.strip()] = value.strip()
+    return first.rstrip(b'\r\n').decode('utf-8', 'replace'), headers
+
+
+def iter_archive(path):
+    """Yield an ArchivedResponse for each response record in the WARC file at *path*.
+
+    Reads ``.warc.gz`` and plain ``.warc`` files one record at a time;
+    records of other types (request, metadata, ...) are skipped.
+    """
+    with open(path, 'rb') as raw:
+        compressed = raw.read(2) == b'\x1f\x8b'
+    opener = gzip.open if compressed else open
+    with opener(path, 'rb') as stream:
+        while True:
+            version, warc_headers = _read_headers(stream)
+            if version is None:
+                return
+            if not version.startswith('WARC/'):
+                raise ValueError(f"{path}: not a WARC record: {version[:40]!r}")
+            block = stream.read(int(warc_headers.get('Content-Length', 0)))
+            if warc_headers.get('WARC-Type') != 'response' or not block.startswith(b'HTTP/'):
+                continue
+            head, _, body = block.partition(b'\r\n\r\n')
+            status_line, *header_lines = head.decode('latin-1').split('\r\n')
+            headers = CaseInsensitiveDict()
+            for line in header_lines:
+                name, _, value = line.partition(':')
+                headers[name.strip()] = value.strip()
+            status = status_line.split(' ', 2)
+            yield ArchivedResponse(warc_headers.get('WARC-Target-URI', '').strip('<>'),
+                                   warc_headers.get('WARC-Date'),
+                                   int(status[1]) if len(status) > 1 and status[1].isdigit() else None,
+                                   headers, body, warc_headers.get('WARC-Truncated'))
+
+
+def iter_latest(path):
+    """Yield the newest successful response for each URL in the archive, in archive order.
+
+    The archive is read twice: once to find each URL's newest record (only
+    that index is kept in memory) and once to yield those records.
+    """
+    latest = {}
+    for number, record in enumerate(iter_archive(path)):
+        if record.status == 200:
+            latest[record.url] = number
+    for number, record in enumerate(iter_archive(path)):
+        if latest.get(record.url) == number:
+            yield record
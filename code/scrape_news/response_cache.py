@@ -0,0 +1,131 @@
+"""Persistent HTTP response cache for scrape-news.py.
+
+Responses are kept in a single SQLite database together with their ETag and
+Last-Modified validators. Entries younger than the TTL are served without
+touching the network; older entries are revalidated with If-None-Match /
+If-Modified-Since so an unchanged page costs a 304 instead of a full
+download. The total body size is bounded and the least recently used
+entries are evicted first. Bodies cut short by the download limits are
+never stored, so they can't be served or revalidated as the whole page.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'scrape-news')
+
+# Response headers worth keeping with the body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Server')
+
+
+class CachedResponse:
+    """A cache entry: the stored body plus its validators."""
+
+    def __init__(self, url, body, headers, stored_at):
+        self.url = url
+        self.body = body
+        self.headers = headers
+        self.stored_at = stored_at
+
+    def conditional_headers(self):
+        """Return the request headers needed to revalidate this entry."""
+        conditional = {}
+        if self.headers.get('ETag'):
+            conditional['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = self.headers['Last-Modified']
+        return conditional
+
+    def to_response(self):
+        """Rebuild a requests.Response so callers can't tell it was cached."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+class ResponseCache:
+    """Size-bounded, LRU-evicted on-disk cache of successful responses."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=86400, max_bytes=500 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'responses.sqlite3'),
+                                   check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._db.commit()
+
+    def get(self, url):
+        """Return the CachedResponse for *url*, or None if it isn't cached."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT body, headers, stored_at FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+        body, header_lines, stored_at = row
+        headers = dict(line.split(': ', 1) for line in header_lines.splitlines() if ': ' in line)
+        return CachedResponse(url, body, headers, stored_at)
+
+    def is_fresh(self, entry):
+        """True if *entry* is within the TTL and can be used without revalidation."""
+        return time.time() - entry.stored_at < self.ttl
+
+    def store(self, url, response):
+        """Store a successful response and evict old entries if over budget."""
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        header_lines = '\n'.join(f"{name}: {response.headers[name]}"
+                                 for name in KEPT_HEADERS if name in response.headers)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (url, body, header_lines, len(body), now, now))
+            self._evict()
+            self._db.commit()
+
+    def discard(self, url):
+        """Forget any entry for *url* (e.g. when only part of the new body was read)."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._db.commit()
+
+    def refresh(self, entry):
+        """Mark *entry* as freshly validated after a 304 Not Modified."""
+        entry.stored_at = time.time()
+        with self._lock:
+            self._db.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?',
+                             (entry.stored_at, entry.stored_at, entry.url))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute(
+                'SELECT url, size FROM responses ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
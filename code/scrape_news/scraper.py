@@ -0,0 +1,1613 @@
+"""Scrape news articles: fetch pages and extract title, authors, publication, date and text.
+
+The command-line tool is ``code/scrape-news.py`` (see build_parser() for
+its options). scrape() and extract() are the library API, re-exported by
+the package:
+
+    from scrape_news import scrape, extract
+
+    article = scrape('https://www.example.com/news/some-story')
+    article = extract(html, 'https://www.example.com/news/some-story')
+    print(article.title, article.publish_date, len(article.text))
+
+Both return an ArticleResult and print nothing. newspaper (and the
+BeautifulSoup it brings in) and dateutil are only imported once a page
+needs them, so importing this module, ``--help`` and pages taken from
+their JSON-LD alone stay fast.
+"""
+import sys
+import argparse
+import contextlib
+import cProfile
+import contextvars
+import html as html_entities
+import importlib.util
+import io
+import multiprocessing
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urljoin, urlparse
+import requests
+import lxml.html
+import re
+from datetime import datetime
+from .date_parsing import find_text_date, parse_date
+from .dedup_index import DEFAULT_DEDUP_PATH, SIMILARITY_THRESHOLD, DedupIndex
+from functools import partial
+from .extraction_profiles import DEFAULT_PROFILES_PATH, ExtractionProfiles
+from .feed_ingest import DEFAULT_FEED_STATE_PATH, FeedIngester
+from .host_scheduler import HostScheduler, parse_retry_after
+from .http_transport import ACCEPT_ENCODING, TRANSPORTS, HttpxAdapter
+from .instrumentation import Metrics
+from .metadata_index import build_json_ld_index, build_metadata_index
+from .output_sinks import TextSink, article_record, open_sinks, parse_sink_spec
+from .publisher_db import lookup_publisher, registrable_name
+from .response_archive import DEFAULT_ARCHIVE_PATH, ResponseArchive, iter_latest
+from .response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from .selector_index import SelectorSet, visible_text
+from .streaming_download import read_body
+from . import daemon
+
+# Configure headers to mimic a real browser and bypass bot detection
+headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    # gzip and deflate, plus br and zstd when a decoder for them is installed
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Sec-CH-UA': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+    'Sec-CH-UA-Mobile': '?0',
+    'Sec-CH-UA-Platform': '"Windows"',
+    'Cache-Control': 'max-age=0',
+}
+
+
+def create_session(pool_connections=10, pool_maxsize=10, transport='requests'):
+    """Return a requests session that keeps connections alive between fetches.
+
+    *pool_connections* is the number of hosts whose connections are kept,
+    *pool_maxsize* the number of connections kept per host. With the
+    'httpx' *transport* requests go out over HTTP/2 where the server
+    supports it, one multiplexed connection per host (see http_transport.py).
+    """
+    new_session = requests.Session()
+    new_session.headers.update(headers)
+    if transport == 'httpx':
+        adapter = HttpxAdapter(max_connections=pool_connections * pool_maxsize,
+                               max_keepalive=pool_connections)
+    else:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections,
+                                                pool_maxsize=pool_maxsize)
+    new_session.mount('http://', adapter)
+    new_session.mount('https://', adapter)
+    return new_session
+
+
+# Shared by every request (retries, the 403 retry and batch fetches)
+session = create_session()
+
+# Optional on-disk response cache, enabled with --cache
+cache = None
+
+# Per-domain record of which fallback method won each field (see --profiles)
+profiles = None
+
+# Rate limits, backoff and circuit breakers per host (see --host-rate)
+scheduler = HostScheduler()
+
+# Statuses worth another attempt; any other error status is final
+RETRY_STATUSES = {403, 408, 425, 429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 3
+
+# Optional index of scraped URLs and text fingerprints, enabled with --dedup
+dedup = None
+
+# Optional WARC archive of every fetched page, enabled with --archive
+archive = None
+
+# Response bodies are streamed and cut off at this many bytes (see --max-size)
+max_body_bytes = 10 * 1024 * 1024
+
+# Stop downloading once the article and its metadata have arrived (see --stop-after-article)
+stop_after_article = False
+
+# Shorter texts mean an extraction missed part of the article
+MIN_ARTICLE_CHARS = 500
+
+# Take complete JSON-LD articles as they are instead of parsing the page (see --full-parse)
+structured_fast_path = True
+
+# Stage timings and counters, enabled with --metrics / --metrics-prom
+metrics = None
+
+# cProfile results of the batch fetch threads, collected under --profile
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def span(stage, url=None):
+    """Time the enclosed block as *stage* when metrics are enabled."""
+    return metrics.span(stage, url) if metrics else contextlib.nullcontext()
+
+
+def count(name, value=1, **labels):
+    """Add to counter *name* when metrics are enabled."""
+    if metrics:
+        metrics.count(name, value, **labels)
+
+
+class ScrapeError(Exception):
+    """Raised when a single article cannot be scraped.
+
+    Batch runs catch this per URL so that one bad URL does not stop the
+    rest of the batch.
+    """
+
+
+class RetryLater(ScrapeError):
+    """Raised when a fetch attempt failed but a later attempt may succeed.
+
+    *response* is the last response received (None after a network
+    error) and *delay* the backoff already applied to the host.
+    """
+
+    def __init__(self, message, response=None, delay=0.0):
+        super().__init__(message)
+        self.response = response
+        self.delay = delay
+
+
+class RetriesExhausted(ScrapeError):
+    """Raised when every fetch attempt failed with an error that may be temporary."""
+
+
+class HostBlocked(ScrapeError):
+    """Raised when a host's circuit breaker is open because of a bot wall."""
+
+
+class DuplicateArticle(Exception):
+    """Raised instead of saving an article that the dedup index already holds."""
+
+
+class ArticleResult:
+    """The fields extracted from one article page.
+
+    *methods* maps each field a fallback had to find to the selector or
+    method that found it (the extraction profiles learn from it).
+    """
+
+    __slots__ = ('url', 'title', 'authors', 'publication', 'publish_date', 'text', 'canonical_url', 'methods')
+
+    def __init__(self, url, title, authors, publication, publish_date, text, canonical_url=None, methods=None):
+        self.url = url
+        self.title = title
+        self.authors = authors
+        self.publication = publication
+        self.publish_date = publish_date
+        self.text = text
+        self.canonical_url = canonical_url
+        self.methods = methods or {}
+
+    def __repr__(self):
+        return f"ArticleResult(url={self.url!r}, title={self.title!r}, {len(self.text)} characters)"
+
+
+def bot_protection(response):
+    """Return the bot protection service behind *response* ('DataDome', 'Cloudflare'), or None."""
+    server_header = response.headers.get('Server', '').lower()
+    response_text = str(response.headers).lower()
+    if 'datadome' in server_header or 'datadome' in response_text:
+        return 'DataDome'
+    if 'cloudflare' in server_header or 'cf-ray' in response_text:
+        return 'Cloudflare'
+    return None
+
+
+def report_failure(final_response, debug_mode=False, message="All retry attempts failed", advice=True):
+    """Print why fetching failed and, with *advice*, how to get past the block."""
+    print(f"\nError: {message}.")
+    
+    # Analyze the response we did get
+    if final_response is not None:
+        print(f"Final status code: {final_response.status_code}")
+        if debug_mode:
+            print(f"Response headers: {dict(final_response.headers)}")
+        if not advice:
+            return
+        
+        # Check for specific bot protection services
+        protection = bot_protection(final_response)
+        if protection == 'DataDome':
+            print("\n🚫 DataDome bot protection detected!")
+            print("This website uses advanced bot protection that blocks automated scraping.")
+            print("\nSuggested workarounds:")
+            print("1. Try accessing the article manually in a browser first")
+            print("2. Use a different URL or try later")
+            print("3. Consider using a proxy service or VPN")
+            print("4. Some sites offer RSS feeds as an alternative")
+            print("5. Try using browser automation tools like Selenium")
+        elif protection == 'Cloudflare':
+            print("\n🚫 Cloudflare protection detected!")
+            print("This website uses Cloudflare bot protection.")
+            print("\nSuggested workarounds:")
+            print("1. Try using a different IP address or VPN")
+            print("2. Wait and retry later")
+            print("3. Use browser automation tools")
+        else:
+            print("\n🚫 Bot protection or access restriction detected!")
+            print("The website is blocking automated access.")
+            print("\nGeneral workarounds:")
+            print("1. Try a different user agent or headers")
+            print("2. Use a proxy service")
+            print("3. Try browser automation tools")
+    else:
+        print("No response received from server.")
+
+
+def _retry_or_fail(url, host, attempt, response, debug_mode):
+    """Turn a failed attempt into RetryLater, or ScrapeError when retrying is pointless."""
+    if response is not None and response.status_code == 403:
+        protection = bot_protection(response)
+        if protection:
+            # Retrying against a bot wall only burns time; skip the host's other URLs too
+            scheduler.trip(host, protection)
+            count('breaker_trips', protection=protection)
+            report_failure(response, debug_mode, f"Blocked by {protection} bot protection")
+            raise HostBlocked(f"blocked by {protection} bot protection")
+    # No word from a bot wall; if this was a half-open breaker's probe, let another URL probe
+    scheduler.release_probe(host, url)
+    if response is not None and response.status_code not in RETRY_STATUSES:
+        report_failure(response, debug_mode, f"HTTP {response.status_code}", advice=False)
+        raise ScrapeError(f"HTTP {response.status_code}")
+    if attempt >= MAX_ATTEMPTS:
+        report_failure(response, debug_mode)
+        raise RetriesExhausted("All retry attempts failed")
+    
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    delay = scheduler.failure(host, retry_after)
+    count('retries', host=host)
+    print(f"Retrying {url} in {delay:.1f}s" + (" (Retry-After)" if retry_after is not None else ""))
+    raise RetryLater(f"attempt {attempt} failed", response, delay)
+
+
+def fetch_attempt(url, debug_mode=False, attempt=1):
+    """Make fetch attempt number *attempt* for *url* and return the successful response.
+
+    Raises RetryLater when the attempt failed but a later one may succeed;
+    the host has been backed off by then (honouring Retry-After). After
+    the last attempt, on a status that retrying won't fix, or when a bot
+    wall answers, the failure is reported and ScrapeError is raised.
+    """
+    host = urlparse(url).netloc.lower()
+    if attempt == 1:
+        print(f"Attempting to scrape: {url}")
+    else:
+        print(f"Retry attempt {attempt}/{MAX_ATTEMPTS}: {url}")
+    
+    # Serve from the response cache when possible, otherwise revalidate
+    cached = cache.get(url) if cache else None
+    conditional_headers = {}
+    if cached is not None:
+        if cache.is_fresh(cached):
+            scheduler.release_probe(host, url)
+            print("Using cached response")
+            count('cache_hits', kind='fresh')
+            return cached.to_response()
+        conditional_headers = cached.conditional_headers()
+    
+    protection = scheduler.blocked(host, probe=url)
+    if protection:
+        raise HostBlocked(f"{host} is behind {protection} bot protection; "
+                          f"not retrying until the circuit breaker cools down")
+    
+    with span('fetch', url):
+        try:
+            response = session.get(url, headers=conditional_headers, timeout=15, stream=True)
+            print(f"HTTP Status: {response.status_code}")
+            count('http_responses', status=response.status_code)
+            
+            if response.status_code == 304 and cached is not None:
+                response.close()
+                print("Cached response is still valid")
+                count('cache_hits', kind='revalidated')
+                scheduler.success(host)
+                cache.refresh(cached)
+                return cached.to_response()
+            
+            if response.status_code != 200:
+                # Only the status and headers of a failed attempt are used
+                response.close()
+                if response.status_code == 403:
+                    print(f"Bot protection detected (403). Trying enhanced headers...")
+                    # Add referrer and additional headers for bot protection
+                    enhanced_headers = headers.copy()
+                    enhanced_headers.update({
+                        'Referer': 'https://www.google.com/',
+                        'DNT': '1',
+                        'Sec-GPC': '1'
+                    })
+                    response = session.get(url, headers=enhanced_headers, timeout=15, stream=True)
+                    print(f"Enhanced request HTTP Status: {response.status_code}")
+                    count('http_responses', status=response.status_code)
+                    if response.status_code != 200:
+                        response.close()
+                elif response.status_code in [429, 503]:  # Rate limiting or service unavailable
+                    print(f"Rate limited or service unavailable. Waiting before retry...")
+            
+            if response.status_code != 200:
+                _retry_or_fail(url, host, attempt, response, debug_mode)
+            
+            # Stream the body so that bloated or endless pages can't exhaust memory
+            body, stopped = read_body(response, max_body_bytes, stop_after_article)
+        except requests.exceptions.Timeout:
+            print(f"Request timeout on attempt {attempt}")
+            _retry_or_fail(url, host, attempt, None, debug_mode)
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed on attempt {attempt}: {e}")
+            _retry_or_fail(url, host, attempt, None, debug_mode)
+    
+    scheduler.success(host)
+    count('bytes_downloaded', len(body))
+    if stopped == 'size cap':
+        print(f"Response truncated at {len(body)} bytes")
+    elif stopped:
+        print(f"Stopped downloading after the article ({len(body)} bytes read)")
+
+    if cache:
+        if stopped:
+            # Not the whole page; an entry (and its ETag) would stand in for it from now on
+            cache.discard(url)
+        else:
+            cache.store(url, response)
+    if archive:
+        archive.append(url, response, body, {'size cap': 'length', 'article complete': 'unspecified'}.get(stopped))
+    
+    return response
+
+
+def fetch_url(url, debug_mode=False):
+    """Fetch *url* with retry logic and return the successful response.
+
+    Waits out the host's rate limit and backoff between attempts. Batch
+    runs call fetch_attempt() directly and reschedule retries instead of
+    sleeping.
+    """
+    host = urlparse(url).netloc.lower()
+    attempt = 1
+    while True:
+        delay = scheduler.reserve(host)
+        if delay:
+            with span('wait', url):
+                time.sleep(delay)
+            continue
+        try:
+            return fetch_attempt(url, debug_mode, attempt)
+        except RetryLater:
+            attempt += 1
+
+
+def newspaper_parse(url, html):
+    """Run newspaper over the fetched page *html* and return the parsed Article.
+
+    newspaper is imported on the first call: it takes a few hundred
+    milliseconds to import and pages taken from their JSON-LD never need it.
+    """
+    from newspaper import Article, Config
+    
+    # Create config with custom headers
+    config = Config()
+    config.browser_user_agent = headers['User-Agent']
+    # parse() would otherwise download the article's images; nothing here uses them
+    config.fetch_images = False
+    
+    # Create article with custom config and feed it the page we already
+    # fetched instead of letting newspaper download it a second time
+    article = Article(url, config=config)
+    article.set_html(html)
+    
+    if not article.html:
+        raise ScrapeError("No HTML content downloaded")
+    
+    article.parse()
+    return article
+
+
+def document_tree(article):
+    """Return the lxml tree newspaper built in ``article.parse()``.
+
+    newspaper keeps an untouched copy of the parsed page in ``clean_doc``;
+    the fallbacks and the publication resolver all read from it so each
+    page is parsed only once. The tree is only re-parsed if newspaper
+    failed to build one.
+    """
+    if article.clean_doc is not None:
+        return article.clean_doc
+    try:
+        return lxml.html.fromstring(article.html)
+    except (ValueError, lxml.etree.ParserError):
+        return lxml.html.fromstring('<html></html>')
+
+
+# Fallback extraction chains, tried in this order unless the domain's
+# extraction profile says another method won last time
+TITLE_SELECTORS = ['h1', 'title', '[data-module="ArticleHeader"] h1', '.ArticleHeader_headline']
+
+CONTENT_SELECTORS = [
+    '[data-module="ArticleBody"]',
+    '.ArticleBody_container',
+    '.article-body',
+    '.story-body',
+    '.content-body',
+    'article',
+    '[role="article"]'
+]
+
+AUTHOR_SELECTORS = ['.author', '.byline', '[data-module="Attribution"]', '.ArticleHeader_byline']
+
+DATE_SELECTORS = ['.date', '.publish-date', '.publication-date', '[data-module="ArticleHeader"] time',
+                  '.ArticleHeader_date', '.timestamp', '.article-date', '.post-date']
+
+META_DATE_TAGS = [
+    {'property': 'article:published_time'},
+    {'name': 'article:published_time'},
+    {'property': 'og:published_time'},
+    {'name': 'publication_date'},
+    {'name': 'pubdate'},
+    {'name': 'date'},
+    {'itemprop': 'datePublished'}
+]
+
+META_PUBLICATION_TAGS = [
+    {'property': 'og:site_name'},
+    {'name': 'application-name'},
+    {'name': 'apple-mobile-web-app-title'},
+    {'property': 'article:publisher'},
+    {'name': 'publisher'},
+    {'name': 'source'},
+    {'property': 'og:publisher'},
+    {'name': 'twitter:site'},
+    {'itemprop': 'publisher'}
+]
+
+PUBLICATION_SELECTORS = [
+    '.site-name', '.site-title', '.logo-text', '.brand-name',
+    '.publication-name', '.masthead', '.site-branding',
+    '[data-testid="SiteName"]', '.navbar-brand',
+    'header .logo', 'header .brand', '.header-logo-text'
+]
+
+# Every selector above, compiled once and matched in a single walk of each page
+FALLBACK_SELECTORS = SelectorSet(TITLE_SELECTORS + CONTENT_SELECTORS + AUTHOR_SELECTORS + DATE_SELECTORS
+                                 + PUBLICATION_SELECTORS)
+
+
+def meta_key(meta_attrs):
+    """Name a meta tag candidate in extraction profiles, e.g. 'meta:property=og:site_name'."""
+    (attr, value), = meta_attrs.items()
+    return f"meta:{attr}={value}"
+
+
+# Last resorts that find something on almost any page. Tried first they would
+# always win, so they are never remembered as a domain's winner.
+CATCH_ALL_METHODS = frozenset({'sign-off', 'text', 'page-title', 'cleaned-domain'})
+
+
+def try_in_order(field, candidates, profile, methods):
+    """Return the first truthy value produced by *candidates*.
+
+    *candidates* is a list of ``(method, attempt)`` pairs. The method that
+    won this field for the domain last time (``profile[field]``) is tried
+    first, unless it is one of the CATCH_ALL_METHODS; on a miss the rest of
+    the chain runs in its usual order. The winning method is recorded in
+    *methods*.
+    """
+    winner = profile.get(field)
+    if winner in CATCH_ALL_METHODS:
+        winner = None
+    for method, attempt in sorted(candidates, key=lambda candidate: candidate[0] != winner):
+        value = attempt()
+        if value:
+            methods[field] = method
+            return value
+    return None
+
+
+def extract_title(selected, profile, methods):
+    def from_selector(selector):
+        title_elem = selected.first(selector)
+        if title_elem is not None:
+            return title_elem.text_content().strip()
+        return None
+    
+    return try_in_order('title', [(selector, partial(from_selector, selector))
+                                  for selector in TITLE_SELECTORS], profile, methods)
+
+
+def extract_content(selected, profile, methods):
+    """Return the longest text among the content selectors.
+
+    If the domain's previous winner alone yields a complete article (500+
+    characters) the remaining selectors are skipped. Text is only read for
+    matches that can win: one inside (or equal to) an earlier selector's
+    match can't have more text than it.
+    """
+    texts = {}
+    
+    def text_of(content_elem):
+        if content_elem not in texts:
+            # Script and style contents are skipped, not removed: the tree is shared
+            texts[content_elem] = visible_text(content_elem)
+        return texts[content_elem]
+    
+    winner = profile.get('content')
+    if winner in CONTENT_SELECTORS and selected.first(winner) is not None:
+        text = text_of(selected.first(winner))
+        if len(text) >= MIN_ARTICLE_CHARS:
+            methods['content'] = winner
+            return text
+    
+    full_text = ""
+    read = []
+    for selector in CONTENT_SELECTORS:
+        content_elem = selected.first(selector)
+        if content_elem is None:
+            continue
+        # Ties go to the earlier selector, so a match within an earlier one can't win
+        if any(elem is earlier for elem in [content_elem, *content_elem.iterancestors()] for earlier in read):
+            continue
+        read.append(content_elem)
+        text = text_of(content_elem)
+        if len(text) > len(full_text):
+            full_text = text
+            methods['content'] = selector
+    return full_text
+
+
+def extract_authors(selected, metadata, article_text, profile, methods):
+    def from_selector(selector):
+        author_elem = selected.first(selector)
+        if author_elem is not None:
+            author_text = author_elem.text_content().strip()
+            # Clean up author text
+            author_text = re.sub(r'^(By|Author:|Written by)\s*', '', author_text, flags=re.IGNORECASE)
+            if author_text:
+                return [author_text]
+        return None
+    
+    # Try to extract from sign-off section (like "Reporting by...")
+    def from_sign_off():
+        sign_off_pattern = r'Reporting by ([^;]+)'
+        sign_off_match = re.search(sign_off_pattern, article_text)
+        if sign_off_match:
+            authors = sign_off_match.group(1).strip()
+            # Clean up "and" separators and "in Location" parts
+            authors = re.sub(r'\s+in\s+[A-Z][a-zA-Z\s,]+$', '', authors)
+            print(f"Extracted authors from sign-off: {authors}")
+            return [authors]
+        return None
+    
+    # Try to extract from meta tags
+    def from_meta():
+        meta_author = metadata.meta({'name': 'article:author'})
+        if meta_author:
+            print(f"Extracted authors from meta tag: {meta_author}")
+            return [meta_author]
+        return None
+    
+    # Try to extract from JSON-LD structured data
+    def from_json_ld():
+        ld_authors = metadata.json_ld_names('author')
+        if ld_authors:
+            print(f"Extracted authors from JSON-LD: {', '.join(ld_authors)}")
+        return ld_authors
+    
+    candidates = [(selector, partial(from_selector, selector)) for selector in AUTHOR_SELECTORS]
+    candidates += [('sign-off', from_sign_off), ('meta', from_meta), ('json-ld', from_json_ld)]
+    return try_in_order('authors', candidates, profile, methods)
+
+
+def extract_date(selected, metadata, article_text, profile, methods):
+    def from_selector(selector):
+        date_elem = selected.first(selector)
+        if date_elem is not None:
+            # Try to get date from datetime attribute first
+            date_text = date_elem.get('datetime') or date_elem.get('content') or date_elem.text_content().strip()
+            parsed_date = parse_date(date_text)
+            if parsed_date:
+                print(f"Extracted date from selector {selector}: {parsed_date}")
+            return parsed_date
+        return None
+
+    def from_meta(meta_attrs):
+        parsed_date = parse_date(metadata.meta(meta_attrs))
+        if parsed_date:
+            print(f"Extracted date from meta tag {meta_attrs}: {parsed_date}")
+        return parsed_date
+    
+    # Try to extract from JSON-LD structured data
+    def from_json_ld():
+        parsed_date = parse_date(metadata.json_ld('datePublished'))
+        if parsed_date:
+            print(f"Extracted date from JSON-LD: {parsed_date}")
+        return parsed_date
+    
+    # Try to extract from <time datetime="..."> elements
+    def from_time_element():
+        for time_value in metadata.times:
+            parsed_date = parse_date(time_value)
+            if parsed_date:
+                print(f"Extracted date from time element: {parsed_date}")
+                return parsed_date
+        return None
+    
+    # Try to extract from article text using regex patterns
+    def from_text():
+        parsed_date, _ = find_text_date(article_text[:1000])  # Search in first 1000 chars
+        if parsed_date:
+            print(f"Extracted date from text pattern: {parsed_date}")
+        return parsed_date
+    
+    candidates = [(selector, partial(from_selector, selector)) for selector in DATE_SELECTORS]
+    candidates += [(meta_key(meta_attrs), partial(from_meta, meta_attrs)) for meta_attrs in META_DATE_TAGS]
+    candidates += [('json-ld', from_json_ld), ('time', from_time_element), ('text', from_text)]
+    return try_in_order('date', candidates, profile, methods)
+
+
+def extract_publication(url, selected, metadata, profile, methods):
+    host = urlparse(url).hostname or ''
+    
+    # Method 1: Look the host (or a parent domain) up in the publisher database
+    def from_domain():
+        publication_name = lookup_publisher(host)
+        if publication_name:
+            print(f"Extracted publication from publisher database: {publication_name}")
+        return publication_name
+    
+    # Method 2: Extract from meta tags
+    def from_meta(meta_attrs):
+        pub_content = metadata.meta(meta_attrs)
+        if pub_content:
+            # Clean up Twitter handle format
+            if pub_content.startswith('@'):
+                pub_content = pub_content[1:]
+            if pub_content and len(pub_content) < 100:  # Reasonable length check
+                print(f"Extracted publication from meta tag {meta_attrs}: {pub_content}")
+                return pub_content
+        return None
+    
+    # Method 3: Extract from JSON-LD structured data (publisher, then organization)
+    def from_json_ld(field):
+        ld_names = metadata.json_ld_names(field)
+        if ld_names:
+            print(f"Extracted publication from JSON-LD {field}: {ld_names[0]}")
+            return ld_names[0]
+        return None
+    
+    # Method 4: Extract from common CSS selectors
+    def from_selector(selector):
+        pub_elem = selected.first(selector)
+        if pub_elem is not None:
+            pub_text = pub_elem.text_content().strip()
+            # Filter out common non-publication text
+            if (pub_text and len(pub_text) < 100 and
+                not any(skip in pub_text.lower() for skip in
+                       ['menu', 'search', 'subscribe', 'login', 'sign in', 'register'])):
+                print(f"Extracted publication from selector {selector}: {pub_text}")
+                return pub_text
+        return None
+    
+    # Method 5: Extract from page title if it contains publication info
+    def from_page_title():
+        page_title = selected.first('title')
+        if page_title is None:
+            return None
+        title_text = page_title.text_content().strip()
+        # Look for patterns like "Article Title - Publication Name" or "Article Title | Publication Name"
+        separators = [' - ', ' | ', ' :: ', ' — ']
+        for sep in separators:
+            if sep in title_text:
+                parts = title_text.split(sep)
+                if len(parts) >= 2:
+                    # Usually the publication name is the last part
+                    potential_pub = parts[-1].strip()
+                    if (len(potential_pub) < 50 and len(potential_pub) > 2 and
+                        not any(skip in potential_pub.lower() for skip in
+                               ['breaking', 'news', 'latest', 'update'])):
+                        print(f"Extracted publication from page title: {potential_pub}")
+                        return potential_pub
+        return None
+    
+    # Method 6: Fallback - name the registrable domain if nothing else worked
+    def from_cleaned_domain():
+        publication_name = registrable_name(host)
+        if publication_name:
+            print(f"Extracted publication from cleaned domain: {publication_name}")
+        return publication_name
+    
+    candidates = [('domain', from_domain)]
+    candidates += [(meta_key(meta_attrs), partial(from_meta, meta_attrs))
+                   for meta_attrs in META_PUBLICATION_TAGS]
+    candidates += [('json-ld:publisher', partial(from_json_ld, 'publisher')),
+                   ('json-ld:organization', partial(from_json_ld, 'organization'))]
+    candidates += [(selector, partial(from_selector, selector)) for selector in PUBLICATION_SELECTORS]
+    candidates += [('page-title', from_page_title), ('cleaned-domain', from_cleaned_domain)]
+    return try_in_order('publication', candidates, profile, methods)
+
+
+def resolve_link(url, link):
+    """Return *link* made absolute against the page *url*, or None unless it is an http(s) URL."""
+    if not isinstance(link, str) or not link.strip():
+        return None
+    link = urljoin(url, link.strip())
+    return link if urlparse(link).scheme in ('http', 'https') else None
+
+
+def extract_structured(url, html, debug_mode=False, output_dir='.', profile=None):
+    """Extract the article from its schema.org JSON-LD, or return None.
+
+    Returns None unless the page has an article-typed JSON-LD node whose
+    articleBody is at least MIN_ARTICLE_CHARS long. Only the JSON-LD
+    blocks are read while the headline, author, datePublished and
+    publisher are all there; otherwise the page is parsed with lxml (not
+    newspaper) and the fallback resolvers run for the missing fields only.
+    """
+    profile = profile or {}
+    with span('structured', url):
+        structured = build_json_ld_index(html)
+        node = structured.article_node()
+        body = node.get('articleBody') if node else None
+        if not isinstance(body, str) or len(body.strip()) < MIN_ARTICLE_CHARS:
+            count('fast_path', result='miss')
+            return None
+        
+        text = html_entities.unescape(body).strip()
+        title = structured.json_ld('headline')
+        title = html_entities.unescape(title).strip() if isinstance(title, str) else None
+        authors = structured.json_ld_names('author')
+        publish_date = parse_date(structured.json_ld('datePublished'))
+        publishers = structured.json_ld_names('publisher')
+        canonical = node.get('url') or structured.resolve(node.get('mainEntityOfPage'))
+        if isinstance(canonical, dict):
+            canonical = canonical.get('@id') or canonical.get('url')
+    
+    methods = {}
+    missing = [field for field, value in (('title', title), ('authors', authors), ('date', publish_date),
+                                          ('publication', publishers)) if not value]
+    if missing:
+        print(f"Structured data lacks {', '.join(missing)}; running those extractors...")
+        with span('metadata', url):
+            try:
+                doc = lxml.html.fromstring(html)
+            except (ValueError, lxml.etree.ParserError):
+                doc = lxml.html.fromstring('<html></html>')
+            metadata = build_metadata_index(doc)
+            selected = FALLBACK_SELECTORS.matcher(doc)
+        if not title:
+            with span('title', url):
+                title = extract_title(selected, profile, methods)
+        if not authors:
+            with span('authors', url):
+                authors = extract_authors(selected, metadata, text, profile, methods) or []
+        if not publish_date:
+            with span('date', url):
+                publish_date = extract_date(selected, metadata, text, profile, methods)
+        if not publishers:
+            with span('publication', url):
+                publishers = [extract_publication(url, selected, metadata, profile, methods)]
+    count('fast_path', result='partial' if missing else 'complete')
+    
+    if debug_mode:
+        with open(os.path.join(output_dir, 'debug_raw.html'), 'wb') as f:
+            f.write(html if isinstance(html, bytes) else html.encode('utf-8'))
+        print("Raw HTML saved to debug_raw.html")
+    
+    print(f"Successfully scraped article from structured data: {title}")
+    print(f"Authors: {', '.join(authors) if authors else 'None found'}")
+    print(f"Publication: {publishers[0] or 'None found'}")
+    print(f"Publish date: {publish_date}")
+    print(f"Text length: {len(text)} characters")
+    
+    return ArticleResult(url, title, authors, publishers[0], publish_date, text,
+                         resolve_link(url, canonical), methods)
+
+
+def extract_article(url, html, debug_mode=False, output_dir='.', profile=None, fast_path=True):
+    """Extract the article fields from the fetched page *html* (bytes).
+
+    This is the CPU-bound stage of the pipeline and touches no network, so
+    batch runs can run it in worker processes. *profile* maps each field
+    to the method that won it for this domain last time (see
+    extraction_profiles.py). With *fast_path*, a page whose JSON-LD holds
+    the whole article is taken from there (see extract_structured) and
+    newspaper's parse is skipped. Returns an ArticleResult.
+    """
+    profile = profile or {}
+    if fast_path:
+        result = extract_structured(url, html, debug_mode, output_dir, profile)
+        if result:
+            return result
+    methods = {}
+    
+    with span('parse', url):
+        article = newspaper_parse(url, html)
+    
+    # One parsed tree, one metadata pass and (if a fallback needs it) one
+    # selector pass per article, shared by every stage below
+    with span('metadata', url):
+        doc = document_tree(article)
+        metadata = build_metadata_index(doc)
+        selected = FALLBACK_SELECTORS.matcher(doc)
+    
+    if debug_mode:
+        print(f"Initial extraction - Title: {article.title}")
+        print(f"Initial extraction - Text length: {len(article.text)}")
+        print(f"Initial extraction - Authors: {article.authors}")
+        with open(os.path.join(output_dir, 'debug_raw.html'), 'w', encoding='utf-8') as f:
+            f.write(article.html)
+        print("Raw HTML saved to debug_raw.html")
+    
+    title, text, authors, publish_date = article.title, article.text, list(article.authors), article.publish_date
+    
+    # Check if parsing was successful and try alternative methods if needed
+    if not title or len(text) < MIN_ARTICLE_CHARS:
+        print("Newspaper extraction seems incomplete, trying alternative methods...")
+        
+        # Try to extract title if missing
+        if not title:
+            with span('title', url):
+                title = extract_title(selected, profile, methods) or title
+        
+        # Try to extract full article content
+        with span('content', url):
+            full_text = extract_content(selected, profile, methods)
+        if full_text and len(full_text) > len(text):
+            text = full_text
+            print(f"Enhanced extraction found more content: {len(full_text)} characters")
+        
+        # Try to extract authors if missing
+        if not authors:
+            with span('authors', url):
+                authors = extract_authors(selected, metadata, text, profile, methods) or []
+        
+        # Try to extract publication date if missing
+        if not publish_date:
+            with span('date', url):
+                publish_date = extract_date(selected, metadata, text, profile, methods)
+    
+    # Try to extract publication/newspaper name (always run this)
+    with span('publication', url):
+        publication_name = extract_publication(url, selected, metadata, profile, methods)
+    
+    print(f"Successfully scraped article: {title}")
+    print(f"Authors: {', '.join(authors) if authors else 'None found'}")
+    print(f"Publication: {publication_name or 'None found'}")
+    print(f"Publish date: {publish_date}")
+    print(f"Text length: {len(text)} characters")
+    
+    return ArticleResult(url, title, authors, publication_name, publish_date, text,
+                         resolve_link(url, article.canonical_link), methods)
+
+
+def extract_in_worker(url, html, debug_mode=False, output_dir='.', profile=None, collect_metrics=False,
+                      fast_path=True):
+    """Run extract_article in an extraction worker process.
+
+    The worker's console output is captured and handed back with the
+    result so each article's log lines stay together (and reach daemon
+    clients). With *collect_metrics* the stage timings are handed back
+    too, as a Metrics snapshot for the parent to merge. Returns
+    ``(result, log, error, metrics snapshot or None)``.
+    """
+    global metrics
+    if collect_metrics and metrics is None:
+        metrics = Metrics()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            result, error = extract_article(url, html, debug_mode, output_dir, profile, fast_path), None
+        except Exception as e:
+            result, error = None, e
+    return result, log.getvalue(), error, metrics.snapshot() if collect_metrics else None
+
+
+def save_article(result, url, sinks, check_duplicates=True):
+    """Write an extracted article to every output sink; return where the first sink put it.
+
+    Raises DuplicateArticle, without writing anything, if the dedup index
+    already has the article or a near-duplicate of its text (unless
+    *check_duplicates* is false).
+    """
+    for field, method in result.methods.items():
+        count('fallback_hits', field=field, method=method)
+    if dedup and check_duplicates:
+        with span('dedup', url):
+            duplicate = dedup.add(url, result.canonical_url, result.text)
+        if duplicate:
+            raise DuplicateArticle(f"duplicate of {duplicate}")
+    record = article_record(result)
+    locations = []
+    with span('save', url):
+        for sink in sinks:
+            location = sink.write(record)
+            print(f"Article saved to: {location}")
+            locations.append(location)
+    return locations[0]
+
+
+def profile_methods(result):
+    """Return the methods of *result* worth remembering in the extraction profiles."""
+    return {field: method for field, method in result.methods.items() if method not in CATCH_ALL_METHODS}
+
+
+def save_result(result, url, sinks, check_duplicates=True):
+    """Record the winning methods and save a batch article; return ``(filename, error)``."""
+    if profiles:
+        profiles.record(url, profile_methods(result))
+    try:
+        return save_article(result, url, sinks, check_duplicates), None
+    except DuplicateArticle as e:
+        return None, e
+
+
+def collect_extraction(url, future, sinks, check_duplicates=True):
+    """Save the article of a finished extract_in_worker() *future*; return ``(filename, error)``."""
+    try:
+        result, log, error, snapshot = future.result()
+    except Exception as e:  # worker process died
+        result, log, error, snapshot = None, '', e, None
+    print(log, end='')
+    if snapshot:
+        metrics.merge(snapshot)
+    if error:
+        return None, error
+    return save_result(result, url, sinks, check_duplicates)
+
+
+def scrape_article(url, debug_mode=False, output_dir='.', sinks=None, attempt=None):
+    """Scrape a single article and write it to *sinks* (by default a text file in *output_dir*).
+
+    Returns the name of the file the article was written to. With an
+    *attempt* number only that one fetch attempt is made, and RetryLater
+    is raised instead of waiting for the next one.
+    """
+    # Use the successful response
+    response = fetch_url(url, debug_mode) if attempt is None else fetch_attempt(url, debug_mode, attempt)
+    result = extract_article(url, response.content, debug_mode, output_dir,
+                             profiles.get(url) if profiles else None, structured_fast_path)
+    if profiles:
+        profiles.record(url, profile_methods(result))
+    return save_article(result, url, sinks or [TextSink(output_dir)])
+
+
+def _discard(message):
+    pass
+
+
+# The JobStdout quiet() put over sys.stdout, and how many quiet() blocks are using it
+_quiet_lock = threading.Lock()
+_quiet_stdout = None
+_quiet_users = 0
+
+
+@contextlib.contextmanager
+def quiet():
+    """Drop print() output in the current context, leaving other threads' output alone.
+
+    Uses the daemon's per-context stdout routing (daemon.JobStdout).
+    Unless the daemon has installed it already, it is put over sys.stdout
+    while any quiet() block runs, and the original restored after the last.
+    """
+    global _quiet_stdout, _quiet_users
+    with _quiet_lock:
+        if _quiet_users == 0 and not isinstance(sys.stdout, daemon.JobStdout):
+            _quiet_stdout = sys.stdout = daemon.JobStdout(sys.stdout)
+        _quiet_users += 1
+    token = daemon.job_output.set(_discard)
+    try:
+        yield
+    finally:
+        daemon.job_output.reset(token)
+        with _quiet_lock:
+            _quiet_users -= 1
+            if _quiet_users == 0 and _quiet_stdout is not None:
+                # Leave sys.stdout alone if someone replaced it in the meantime
+                if sys.stdout is _quiet_stdout:
+                    sys.stdout = _quiet_stdout.console
+                _quiet_stdout = None
+
+
+def extract(html, url, fast_path=True):
+    """Extract the article from *html* (bytes or str), the page fetched from *url*.
+
+    Library entry point: returns an ArticleResult and prints nothing.
+    With *fast_path* a page whose JSON-LD holds the whole article is
+    taken from there without importing or running newspaper.
+    """
+    with quiet():
+        return extract_article(url, html, fast_path=fast_path)
+
+
+def scrape(url, fast_path=True):
+    """Fetch *url* and extract its article; return an ArticleResult.
+
+    Library entry point: prints nothing and writes no files. Fetches go
+    through the module's shared session and host scheduler, so calls from
+    several threads share pooled connections and per-host rate limits.
+    Raises ScrapeError if the page can't be fetched.
+    """
+    with quiet():
+        response = fetch_url(url)
+        return extract_article(url, response.content, fast_path=fast_path)
+
+
+def read_urls(sources, stdin=None, base_dir='.'):
+    """Yield URLs from URL list files.
+
+    *sources* holds file paths relative to *base_dir* ('-' for *stdin*,
+    which defaults to sys.stdin). Blank lines and lines starting with '#'
+    are ignored.
+    """
+    stdin = stdin or sys.stdin
+    for source in sources:
+        if source == '-':
+            lines = stdin
+        else:
+            lines = open(os.path.join(base_dir, source), encoding='utf-8')
+        try:
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if lines is not stdin:
+                lines.close()
+
+
+# Extraction worker pools by size, reused across batches (and daemon jobs)
+_extract_pools = {}
+_extract_pools_lock = threading.Lock()
+
+
+def run_task(task, *args):
+    """Call *task* in a batch fetch thread, under cProfile when --profile is on."""
+    if _profiles is None:
+        return task(*args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(task, *args)
+    finally:
+        with _profiles_lock:
+            _profiles.append(profiler)
+
+
+def get_extract_pool(workers):
+    """Return a process pool with *workers* extraction processes.
+
+    Each size gets its own pool, kept for reuse: concurrent daemon jobs
+    asking for different sizes must not shut down a pool the other is using.
+    """
+    with _extract_pools_lock:
+        pool = _extract_pools.get(workers)
+        if pool is None:
+            # forkserver avoids forking a process that already runs fetch threads
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+            pool = _extract_pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return pool
+
+
+def scrape_batch(urls, debug_mode=False, max_workers=8, per_host=2, output_dir='.',
+                 extract_workers=0, sinks=None):
+    """Scrape many URLs concurrently.
+
+    At most *max_workers* articles are fetched at once, and at most
+    *per_host* of them target the same host so publishers don't throttle
+    us. Each host's requests also go through the scheduler's rate limit
+    and backoff. URLs waiting on a busy, throttled or backed-off host stay
+    queued instead of tying up a worker thread, and a failed attempt goes
+    back into its host's queue rather than sleeping in a thread. Once a
+    bot wall trips a host's circuit breaker, the rest of that host's
+    queue fails immediately. Yields ``(url, filename, error)`` as each
+    article finishes; exactly one of *filename* and *error* is set.
+
+    With *extract_workers* > 0, fetching and extraction run as separate
+    stages: fetch threads hand the raw page bytes to a pool of extraction
+    processes, so CPU-bound parsing scales with cores instead of queueing
+    behind the GIL. No more than ``2 * extract_workers`` fetched pages wait
+    for extraction; fetching pauses until the extraction stage catches up.
+    Articles go to *sinks* (by default text files in *output_dir*).
+    """
+    sinks = sinks or [TextSink(output_dir)]
+    pending = {}
+    for url in urls:
+        pending.setdefault(urlparse(url).netloc.lower(), deque()).append((url, 1))
+    hosts = deque(pending)
+    active_per_host = dict.fromkeys(pending, 0)
+    fetching = {}
+    extracting = {}
+    pool = get_extract_pool(extract_workers) if extract_workers > 0 else None
+    max_in_flight = max_workers + 2 * extract_workers
+    
+    def dispatch(executor):
+        """Start the fetches that may start now.
+
+        Returns the URLs failed without a request (host behind a bot wall)
+        and the number of seconds until a throttled host is ready, or None.
+        A host whose half-open breaker is being probed counts as throttled.
+        """
+        blocked = []
+        next_ready = None
+        # Round-robin over hosts so one large outlet doesn't starve the rest
+        idle_hosts = 0
+        while (len(fetching) < max_workers and len(fetching) + len(extracting) < max_in_flight
+               and idle_hosts < len(hosts)):
+            host = hosts[0]
+            hosts.rotate(-1)
+            idle_hosts += 1
+            if not pending[host] or active_per_host[host] >= per_host:
+                continue
+            url, attempt = pending[host][0]
+            delay = scheduler.probe_pending(host, url)
+            if delay:
+                next_ready = delay if next_ready is None else min(next_ready, delay)
+                continue
+            protection = scheduler.blocked(host, probe=url)
+            if protection:
+                while pending[host]:
+                    url, _ = pending[host].popleft()
+                    blocked.append((url, HostBlocked(f"{host} is behind {protection} bot protection")))
+                continue
+            delay = scheduler.reserve(host)
+            if delay:
+                next_ready = delay if next_ready is None else min(next_ready, delay)
+                continue
+            pending[host].popleft()
+            active_per_host[host] += 1
+            task = fetch_attempt if pool else scrape_article
+            args = (url, debug_mode, attempt) if pool else (url, debug_mode, output_dir, sinks, attempt)
+            # Run in a copy of our context so daemon jobs keep their output stream
+            fetching[executor.submit(contextvars.copy_context().run, run_task, task, *args)] = (url, host, attempt)
+            idle_hosts = 0
+        return blocked, next_ready
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        blocked, next_ready = dispatch(executor)
+        while True:
+            for url, error in blocked:
+                yield url, None, error
+            if not (fetching or extracting):
+                if not any(pending.values()):
+                    break
+                # Every queued host is rate limited or backing off
+                time.sleep(next_ready or 0.05)
+                blocked, next_ready = dispatch(executor)
+                continue
+            done, _ = wait(list(fetching) + list(extracting), timeout=next_ready,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    url, host, attempt = fetching.pop(future)
+                    active_per_host[host] -= 1
+                    error = future.exception()
+                    if isinstance(error, RetryLater):
+                        # Back to the front of its host's queue; dispatch() waits out the backoff
+                        pending[host].appendleft((url, attempt + 1))
+                    elif error or not pool:
+                        yield url, None if error else future.result(), error
+                    else:
+                        extracting[pool.submit(extract_in_worker, url, future.result().content,
+                                               debug_mode, output_dir,
+                                               profiles.get(url) if profiles else None,
+                                               metrics is not None, structured_fast_path)] = url
+                else:
+                    url = extracting.pop(future)
+                    yield (url,) + collect_extraction(url, future, sinks)
+            blocked, next_ready = dispatch(executor)
+
+
+def reextract_batch(records, debug_mode=False, output_dir='.', extract_workers=0, sinks=None):
+    """Run the extraction pipeline over archived responses, without network access.
+
+    *records* are ArchivedResponse objects (see response_archive.py).
+    With *extract_workers* > 0 they are extracted in the process pool, no
+    more than ``2 * extract_workers`` at a time, so the archive is streamed
+    rather than loaded. The dedup index is not consulted: the archived
+    articles are in it already. Yields ``(url, filename, error)`` as each
+    article finishes, like scrape_batch().
+    """
+    sinks = sinks or [TextSink(output_dir)]
+    if extract_workers <= 0:
+        for record in records:
+            try:
+                result = extract_article(record.url, record.body, debug_mode, output_dir,
+                                         profiles.get(record.url) if profiles else None, structured_fast_path)
+            except Exception as e:
+                yield record.url, None, e
+                continue
+            yield (record.url,) + save_result(result, record.url, sinks, check_duplicates=False)
+        return
+    
+    pool = get_extract_pool(extract_workers)
+    extracting = {}
+    records = iter(records)
+    while True:
+        for record in records:
+            extracting[pool.submit(extract_in_worker, record.url, record.body, debug_mode, output_dir,
+                                   profiles.get(record.url) if profiles else None,
+                                   metrics is not None, structured_fast_path)] = record.url
+            if len(extracting) >= 2 * extract_workers:
+                break
+        if not extracting:
+            return
+        done, _ = wait(extracting, return_when=FIRST_COMPLETED)
+        for future in done:
+            url = extracting.pop(future)
+            yield (url,) + collect_extraction(url, future, sinks, check_duplicates=False)
+
+
+def output_spec(value):
+    """argparse type for --output."""
+    try:
+        return parse_sink_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Scrape news articles into plain text files, JSON Lines, SQLite or a search index.")
+    parser.add_argument('urls', nargs='*', metavar='URL',
+                        help="article URL(s) to scrape")
+    parser.add_argument('-i', '--input', action='append', default=[], metavar='FILE',
+                        help="read URLs from FILE, one per line ('-' for stdin); may be repeated")
+    parser.add_argument('--feed', action='append', default=[], metavar='URL',
+                        help="scrape the new entries of an RSS/Atom feed or (news) sitemap; may be repeated")
+    parser.add_argument('--feeds', action='append', default=[], metavar='FILE',
+                        help="read feed URLs from FILE, one per line ('-' for stdin); may be repeated")
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help="keep polling the feeds every SECONDS and scrape what is new")
+    parser.add_argument('--feed-state', default=DEFAULT_FEED_STATE_PATH, metavar='PATH',
+                        help=f"file holding each feed's validators and last-seen entry date "
+                             f"(default: {DEFAULT_FEED_STATE_PATH})")
+    parser.add_argument('--feed-max-age', type=float, default=48, metavar='HOURS',
+                        help="ignore feed entries older than this, even on a feed's first poll; "
+                             "0 for no limit (default: 48)")
+    parser.add_argument('-o', '--output', action='append', type=output_spec, metavar='FORMAT[:PATH]',
+                        help="where to write articles: 'txt' (one file per article, the default), "
+                             "'jsonl[:PATH]' (default articles.jsonl), 'sqlite[:PATH]' "
+                             "(default articles.sqlite3) or 'search[:PATH]', a full-text index for "
+                             "search_index.py (default news-index.sqlite3); may be repeated")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="maximum number of articles fetched at once (default: 8)")
+    parser.add_argument('--per-host', type=int, default=2,
+                        help="maximum concurrent fetches per host (default: 2)")
+    parser.add_argument('--host-rate', type=float, default=4, metavar='N',
+                        help="maximum requests per second started for one host; 0 for no limit (default: 4)")
+    parser.add_argument('--breaker-cooldown', type=float, default=300, metavar='SECONDS',
+                        help="after a bot wall answers, skip that host's URLs for this long (default: 300)")
+    parser.add_argument('--transport', choices=TRANSPORTS, default='requests',
+                        help="HTTP client: 'requests' (HTTP/1.1) or 'httpx' (HTTP/2, one multiplexed "
+                             "connection per host; needs httpx[http2]) (default: requests)")
+    parser.add_argument('--extract-workers', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help="batch mode: number of extraction processes fed by the fetch threads; "
+                             "0 extracts in the fetch threads (default: number of CPUs)")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, metavar='DIR',
+                        help=f"cache responses on disk and revalidate them on later runs "
+                             f"(default DIR: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--cache-ttl', type=float, default=86400, metavar='SECONDS',
+                        help="serve cached responses younger than this without revalidating (default: 86400)")
+    parser.add_argument('--cache-size', type=float, default=500, metavar='MB',
+                        help="maximum size of cached response bodies before LRU eviction (default: 500)")
+    parser.add_argument('--max-size', type=float, default=10, metavar='MB',
+                        help="stop downloading a page after this many (decompressed) megabytes; "
+                             "0 disables the limit (default: 10)")
+    parser.add_argument('--stop-after-article', action='store_true',
+                        help="stop downloading a page once its <head> and first <article> have arrived")
+    parser.add_argument('--archive', nargs='?', const=DEFAULT_ARCHIVE_PATH, metavar='PATH',
+                        help=f"append every fetched page to a WARC archive for --reextract "
+                             f"(default PATH: {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument('--reextract', metavar='ARCHIVE',
+                        help="run the extraction over the newest page of each URL in a --archive "
+                             "WARC file instead of fetching anything, and write the results to the outputs")
+    parser.add_argument('--dedup', nargs='?', const=DEFAULT_DEDUP_PATH, metavar='PATH',
+                        help=f"skip URLs (tracking parameters and AMP variants included) and "
+                             f"near-duplicate texts that were scraped before (default PATH: {DEFAULT_DEDUP_PATH})")
+    parser.add_argument('--dedup-similarity', type=float, default=SIMILARITY_THRESHOLD, metavar='J',
+                        help=f"texts with at least this estimated Jaccard similarity (0-1) are "
+                             f"near-duplicates (default: {SIMILARITY_THRESHOLD})")
+    parser.add_argument('--full-parse', action='store_true',
+                        help="always run newspaper's full parse, even when the page's JSON-LD "
+                             "already holds the complete article")
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES_PATH, metavar='PATH',
+                        help=f"file remembering which extraction method works for each domain "
+                             f"(default: {DEFAULT_PROFILES_PATH})")
+    parser.add_argument('--no-profiles', action='store_true',
+                        help="always run the full fallback chains and don't update the profiles")
+    parser.add_argument('--serve', action='store_true',
+                        help="run as a daemon accepting jobs from scrape-news-client.py on a Unix socket")
+    parser.add_argument('--socket', default=daemon.DEFAULT_SOCKET, metavar='PATH',
+                        help=f"Unix socket used by --serve (default: {daemon.DEFAULT_SOCKET})")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="append per-stage timings (fetch, parse, the field resolvers, save, ...) "
+                             "to FILE as JSON lines")
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help="write stage totals and counters (HTTP statuses, retries, fallback hits, "
+                             "bytes downloaded, ...) to FILE in Prometheus textfile format")
+    parser.add_argument('--profile', nargs='?', const='scrape-news.prof', metavar='FILE',
+                        help="run under cProfile, print the top functions by cumulative time and "
+                             "save the stats to FILE (default: scrape-news.prof); extraction then "
+                             "runs in the fetch threads")
+    parser.add_argument('--debug', action='store_true',
+                        help="print extraction details and save raw HTML to debug_raw.html")
+    return parser
+
+
+@contextlib.contextmanager
+def open_outputs(args, output_dir='.'):
+    """Open the --output sinks of a run; flush them, the profiles and the metrics when it ends."""
+    sinks = open_sinks(args.output or [('txt', None)], output_dir)
+    try:
+        yield sinks
+    finally:
+        # Flush the last batch of the JSON Lines and SQLite outputs
+        for sink in sinks:
+            sink.close()
+        if profiles:
+            profiles.save()
+        if metrics:
+            metrics.flush()
+
+
+def worth_retrying(error):
+    """Tell whether a URL that failed with *error* may succeed on a later run.
+
+    Network errors and exhausted retries may; a 404, a bot wall or a page
+    that can't be extracted won't.
+    """
+    return isinstance(error, (RetriesExhausted, requests.exceptions.RequestException))
+
+
+def scrape_urls(urls, args, output_dir='.', retry=None):
+    """Scrape *urls* one-shot or as a batch; return the process exit status.
+
+    The URLs whose failure is worth_retrying() are added to the set *retry*, if given.
+    """
+    with open_outputs(args, output_dir) as sinks:
+        return _scrape_urls(urls, args, output_dir, sinks, set() if retry is None else retry)
+
+
+def reextract(archive_path, args, output_dir='.'):
+    """Re-run extraction over the pages archived in *archive_path*; return the process exit status."""
+    if not os.path.exists(archive_path):
+        print(f"Error: no archive at {archive_path}")
+        return 1
+    print(f"Re-extracting {archive_path} with {max(0, args.extract_workers)} extraction processes")
+    with open_outputs(args, output_dir) as sinks:
+        return report_batch(reextract_batch(iter_latest(archive_path), args.debug, output_dir,
+                                            max(0, args.extract_workers), sinks))
+
+
+def report_batch(results, total=None, retry_urls=None):
+    """Print each ``(url, filename, error)`` of a batch and a summary; return the exit status.
+
+    Failed URLs that are worth_retrying() are added to the set *retry_urls*, if given.
+    """
+    done = failed = duplicates = 0
+    for done, (url, filename, error) in enumerate(results, 1):
+        progress = f"[{done}/{total}]" if total else f"[{done}]"
+        if error is None:
+            print(f"{progress} OK {url} -> {filename}")
+            count('articles', result='ok')
+        elif isinstance(error, DuplicateArticle):
+            duplicates += 1
+            print(f"{progress} SKIPPED {url}: {error}")
+            count('articles', result='duplicate')
+        else:
+            failed += 1
+            if retry_urls is not None and worth_retrying(error):
+                retry_urls.add(url)
+            print(f"{progress} FAILED {url}: {type(error).__name__}: {error}")
+            count('articles', result='failed')
+    
+    print(f"Batch complete: {done - failed - duplicates} succeeded, "
+          f"{duplicates} duplicates skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+def _scrape_urls(urls, args, output_dir, sinks, retry):
+    if dedup:
+        # Skip URLs that were scraped before without touching the network
+        new_urls = []
+        for url, duplicate in dedup.new_urls(urls):
+            if duplicate:
+                print(f"Skipping {url}: duplicate of {duplicate}")
+            else:
+                new_urls.append(url)
+        if not new_urls:
+            print("Nothing new to scrape")
+            return 0
+        urls = new_urls
+    
+    # Single URL: keep the original one-shot behaviour
+    if len(urls) == 1:
+        try:
+            scrape_article(urls[0], args.debug, output_dir, sinks)
+        except DuplicateArticle as e:
+            print(f"Skipping article: {e}")
+            count('articles', result='duplicate')
+            return 0
+        except ScrapeError as e:
+            print(f"Error: {e}")
+            if worth_retrying(e):
+                retry.add(urls[0])
+            count('articles', result='failed')
+            return 1
+        except requests.exceptions.RequestException as e:
+            print(f"Network error: {e}")
+            retry.add(urls[0])
+            count('articles', result='failed')
+            return 1
+        except Exception as e:
+            print(f"Error: {e}")
+            print(f"Error type: {type(e).__name__}")
+            count('articles', result='failed')
+            return 1
+        count('articles', result='ok')
+        return 0
+    
+    print(f"Batch mode: {len(urls)} URLs, {args.workers} workers, {args.per_host} per host")
+    return report_batch(scrape_batch(urls, args.debug, max(1, args.workers), max(1, args.per_host),
+                                     output_dir, max(0, args.extract_workers), sinks), len(urls), retry)
+
+
+def ingest_feeds(feeds, args, urls=(), output_dir='.'):
+    """Scrape the new entries of *feeds* (and *urls*); with --watch, keep polling.
+
+    Returns the exit status of the last round.
+    """
+    ingester = FeedIngester(session, os.path.join(output_dir, args.feed_state),
+                            max_age=args.feed_max_age * 3600 if args.feed_max_age > 0 else None)
+    try:
+        while True:
+            new_urls = list(urls)
+            for feed in feeds:
+                new_urls.extend(url for url, _ in ingester.poll(feed))
+            # The same article is often in both the RSS feed and the news sitemap
+            new_urls = list(dict.fromkeys(new_urls))
+            retry = set()
+            if new_urls:
+                status = scrape_urls(new_urls, args, output_dir, retry)
+            else:
+                print("No new feed entries")
+                status = 0
+            # Only now move the watermarks past what was just scraped; transient failures come back next poll
+            ingester.commit(retry)
+            if not args.watch:
+                return status
+            urls = ()
+            time.sleep(args.watch)
+    finally:
+        ingester.close()
+
+
+def run_daemon_job(argv, cwd, stdin=None):
+    """Run one client invocation inside the daemon.
+
+    The daemon's session, transport, scheduler, cache, dedup, download,
+    extraction and metrics settings apply to every job; a job's own
+    --transport, --host-rate,
+    --breaker-cooldown, --cache, --dedup, --archive, --max-size,
+    --stop-after-article, --full-parse, --metrics, --metrics-prom,
+    --profiles, --no-profiles and --profile options are ignored. Rate limits, backoff and tripped circuit breakers therefore
+    carry over from one job to the next.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.reextract:
+        return reextract(os.path.join(cwd, args.reextract), args, cwd)
+    stdin = io.StringIO(stdin) if stdin is not None else io.StringIO()
+    urls = list(args.urls) + list(read_urls(args.input, stdin, cwd))
+    feeds = list(args.feed) + list(read_urls(args.feeds, stdin, cwd))
+    if feeds:
+        return ingest_feeds(feeds, args, urls, cwd)
+    if not urls:
+        parser.print_usage(sys.stdout)
+        return 1
+    return scrape_urls(urls, args, cwd)
+
+
+def main(argv=None):
+    global session, scheduler, cache, dedup, profiles, max_body_bytes, stop_after_article, metrics, _profiles
+    global structured_fast_path, archive
+    # Only checked here; date_parsing imports dateutil when a date needs it
+    if importlib.util.find_spec('dateutil') is None:
+        print("Warning: dateutil not installed. Date parsing may be limited.")
+        print("Install with: pip install python-dateutil")
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.serve and args.profile:
+        parser.error("--profile can't be used with --serve (the daemon's jobs ignore it)")
+    
+    scheduler = HostScheduler(rate=args.host_rate, breaker_cooldown=args.breaker_cooldown)
+    max_body_bytes = int(args.max_size * 1024 * 1024) if args.max_size > 0 else None
+    stop_after_article = args.stop_after_article
+    structured_fast_path = not args.full_parse
+    
+    if args.cache:
+        cache = ResponseCache(args.cache, ttl=args.cache_ttl,
+                              max_bytes=int(args.cache_size * 1024 * 1024))
+    
+    if args.dedup:
+        dedup = DedupIndex(args.dedup, args.dedup_similarity)
+    
+    if args.archive:
+        archive = ResponseArchive(args.archive)
+    
+    if not args.no_profiles:
+        profiles = ExtractionProfiles(args.profiles)
+    
+    if args.metrics or args.metrics_prom:
+        metrics = Metrics(args.metrics, args.metrics_prom)
+    
+    if args.transport != 'requests':
+        try:
+            session = create_session(transport=args.transport)
+        except ImportError as e:
+            print(f"Error: {e}")
+            return 1
+    
+    if args.serve:
+        # One warm session for every job the daemon will run
+        session = create_session(pool_connections=max(10, args.workers),
+                                 pool_maxsize=max(10, args.per_host), transport=args.transport)
+        # Import newspaper now rather than in the first job that needs it
+        import newspaper  # noqa: F401
+        return daemon.serve(run_daemon_job, args.socket)
+    
+    if args.reextract:
+        return run_profiled(args, reextract, args.reextract, args)
+    
+    urls = list(args.urls) + list(read_urls(args.input))
+    feeds = list(args.feed) + list(read_urls(args.feeds))
+    if not (urls or feeds):
+        parser.print_usage()
+        return 1
+    
+    if len(urls) > 1 or feeds:
+        # Keep enough pooled connections for every worker
+        session = create_session(pool_connections=max(10, args.workers),
+                                 pool_maxsize=max(10, args.per_host), transport=args.transport)
+    
+    if feeds:
+        return run_profiled(args, ingest_feeds, feeds, args, urls)
+    return run_profiled(args, scrape_urls, urls, args)
+
+
+def run_profiled(args, task, *task_args):
+    """Call *task* with *task_args*; with --profile, under cProfile, reporting where the time went."""
+    global _profiles
+    if not args.profile:
+        return task(*task_args)
+    # Extract in-process, where cProfile can see it
+    args.extract_workers = 0
+    _profiles = []
+    profiler = cProfile.Profile()
+    status = profiler.runcall(task, *task_args)
+    stats = pstats.Stats(profiler)
+    for thread_profiler in _profiles:
+        stats.add(thread_profiler)
+    stats.dump_stats(args.profile)
+    print(f"\nProfile saved to {args.profile} (open with python3 -m pstats)")
+    stats.sort_stats('cumulative').print_stats(25)
+    return status
+
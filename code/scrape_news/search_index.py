@@ -0,0 +1,234 @@
+"""Full-text search over scraped articles.
+
+`SearchIndex` keeps the articles in an SQLite database with an FTS5 index
+over their title, authors, publication, text and URL; publish dates are
+kept alongside for range filters. The ``search`` output of scrape-news.py
+(``-o search``) adds each article as it is written, and a bulk import
+reads the ``.txt`` files written before the index existed.
+
+Its main() is the query tool, ``code/search-news.py``. Like the daemon
+client it only needs the standard library, so a query starts and
+finishes in a few milliseconds:
+
+    python3 code/search-news.py 'sea wall'                   # ranked by relevance
+    python3 code/search-news.py 'title:strike AND port' --since 2024-01-01
+    python3 code/search-news.py --import ~/News              # one-time import of .txt files
+
+Queries use the FTS5 syntax: phrases in double quotes, AND/OR/NOT,
+``NEAR(a b)``, prefixes (``harb*``) and column filters (``title:``,
+``authors:``, ``publication:``, ``url:``).
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+DEFAULT_INDEX_PATH = 'news-index.sqlite3'
+
+# bm25() weights for title, authors, publication, text and url
+COLUMN_WEIGHTS = (10.0, 4.0, 4.0, 1.0, 2.0)
+
+
+def parse_text_file(content):
+    """Split an article ``.txt`` file into a record, or return None if it isn't one.
+
+    The layout is six blocks separated by blank lines: title, authors
+    ("Unknown" when none), publication ("Unknown"), publish date ("None"),
+    the text, and the URL on the last line.
+    """
+    parts = content.split('\n\n', 4)
+    if len(parts) < 5:
+        return None
+    title, authors, publication, publish_date, rest = parts
+    text, _, url = rest.rstrip('\n').rpartition('\n\n')
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')) or '\n' in url:
+        return None
+    try:
+        publish_date = datetime.fromisoformat(publish_date.strip()).isoformat()
+    except ValueError:
+        publish_date = None
+    return {
+        'url': url,
+        'title': title.strip(),
+        'authors': [] if authors.strip() == 'Unknown' else [name.strip() for name in authors.split(',')],
+        'publication': None if publication.strip() == 'Unknown' else publication.strip(),
+        'publish_date': publish_date,
+        'text': text.strip(),
+    }
+
+
+class SearchIndex:
+    """SQLite FTS5 index of articles, one row per URL."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        # External-content FTS table: the text is stored once, in articles
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                title TEXT,
+                authors TEXT,
+                publication TEXT,
+                publish_date TEXT,
+                text TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_publish_date ON articles (publish_date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, authors, publication, text, url,
+                content='articles', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, authors, publication, text, url)
+                VALUES (new.id, new.title, new.authors, new.publication, new.text, new.url);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, authors, publication, text, url)
+                VALUES ('delete', old.id, old.title, old.authors, old.publication, old.text, old.url);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, authors, publication, text, url)
+                VALUES ('delete', old.id, old.title, old.authors, old.publication, old.text, old.url);
+                INSERT INTO articles_fts (rowid, title, authors, publication, text, url)
+                VALUES (new.id, new.title, new.authors, new.publication, new.text, new.url);
+            END;
+        ''')
+        self._db.commit()
+
+    def add(self, records):
+        """Index *records* (see output_sinks.article_record) in one transaction; a known URL is replaced."""
+        now = time.time()
+        with self._db:
+            self._db.executemany('''
+                INSERT INTO articles (url, title, authors, publication, publish_date, text, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    title = excluded.title, authors = excluded.authors,
+                    publication = excluded.publication, publish_date = excluded.publish_date,
+                    text = excluded.text, indexed_at = excluded.indexed_at''',
+                [(record['url'], record['title'], ', '.join(record['authors']), record['publication'],
+                  record['publish_date'], record['text'], now) for record in records])
+
+    def import_directory(self, directory, batch_size=500):
+        """Index every article ``.txt`` file in *directory*; return (imported, skipped)."""
+        imported = skipped = 0
+        batch = []
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if not entry.is_file() or not entry.name.endswith('.txt'):
+                continue
+            try:
+                with open(entry.path, encoding='utf-8') as f:
+                    record = parse_text_file(f.read())
+            except (OSError, UnicodeDecodeError):
+                record = None
+            if record is None:
+                skipped += 1
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            self.add(batch)
+            imported += len(batch)
+        self.optimize()
+        return imported, skipped
+
+    def optimize(self):
+        """Merge the FTS index segments, which keeps it compact and fast after a bulk import."""
+        with self._db:
+            self._db.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+
+    def search(self, query, limit=10, publication=None, since=None, until=None):
+        """Return up to *limit* matches for the FTS5 *query*, best first.
+
+        Each match is a dict with the url, title, authors, publication,
+        publish_date, a text snippet around the hits and the bm25 score.
+        *since* and *until* (ISO dates) bound the publish date. A query
+        that isn't valid FTS5 syntax is searched for as plain words.
+        """
+        conditions, parameters = ['articles_fts MATCH ?'], [query]
+        if publication:
+            conditions.append('articles.publication = ? COLLATE NOCASE')
+            parameters.append(publication)
+        if since:
+            conditions.append('articles.publish_date >= ?')
+            parameters.append(since)
+        if until:
+            # Dates are stored with their time; include the whole of the last day
+            conditions.append('articles.publish_date < ?')
+            parameters.append(until + '\uffff')
+        sql = f'''
+            SELECT articles.url, articles.title, articles.authors, articles.publication,
+                   articles.publish_date, snippet(articles_fts, 3, '[', ']', '...', 16),
+                   bm25(articles_fts, {', '.join(map(str, COLUMN_WEIGHTS))}) AS score
+            FROM articles_fts JOIN articles ON articles.id = articles_fts.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY score LIMIT ?'''
+        try:
+            rows = self._db.execute(sql, parameters + [limit]).fetchall()
+        except sqlite3.OperationalError:
+            # Not a valid FTS5 query ('unterminated string', 'fts5: syntax error near ...',
+            # 'no such column' and so on); anything else fails again below
+            parameters[0] = ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+            rows = self._db.execute(sql, parameters + [limit]).fetchall()
+        return [{'url': url, 'title': title, 'authors': authors, 'publication': publication,
+                 'publish_date': publish_date, 'snippet': snippet, 'score': score}
+                for url, title, authors, publication, publish_date, snippet, score in rows]
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the articles indexed by scrape-news.py's search output.")
+    parser.add_argument('query', nargs='*', help="FTS5 query, e.g. 'sea wall' or 'title:strike AND port'")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, metavar='PATH',
+                        help=f"search index database (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument('-n', '--limit', type=int, default=10, help="number of results (default: 10)")
+    parser.add_argument('--publication', metavar='NAME', help="only articles from this publication")
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help="only articles published on or after this date")
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help="only articles published on or before this date")
+    parser.add_argument('--import', dest='import_dir', metavar='DIR',
+                        help="index the article .txt files in DIR (e.g. ~/News) and exit")
+    args = parser.parse_args(argv)
+
+    if not args.import_dir and not args.query:
+        parser.print_usage()
+        return 1
+    if not args.import_dir and not os.path.exists(args.index):
+        print(f"No search index at {args.index}; build one with -o search or --import DIR")
+        return 1
+    index = SearchIndex(args.index)
+    try:
+        if args.import_dir:
+            start = time.perf_counter()
+            imported, skipped = index.import_directory(os.path.expanduser(args.import_dir))
+            print(f"Indexed {imported} articles in {time.perf_counter() - start:.1f}s"
+                  + (f", skipped {skipped} files not in the article layout" if skipped else ""))
+            return 0
+
+        start = time.perf_counter()
+        results = index.search(' '.join(args.query), max(1, args.limit), args.publication, args.since, args.until)
+        elapsed = time.perf_counter() - start
+        for rank, result in enumerate(results, 1):
+            details = ', '.join(filter(None, [result['publication'], (result['publish_date'] or '')[:10],
+                                              result['authors']]))
+            print(f"{rank}. {result['title']}" + (f" ({details})" if details else ""))
+            print(f"   {result['url']}")
+            print(f"   {' '.join(result['snippet'].split())}")
+        print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+        return 0
+    finally:
+        index.close()
+
@@ -0,0 +1,229 @@
+"""One-pass matching of the fallback extractors' CSS selectors.
+
+The title, content, author, date and publication fallbacks in
+scrape-news.py each try a list of CSS selectors, about forty in all.
+Running them one by one means a full search of the document per
+selector. `SelectorSet` compiles the whole list once: each selector is
+filed under its rightmost tag, class, id or attribute name, so a single
+walk over the document finds the first match of every selector, in the
+same document order ``CSSSelector`` would return. Selectors outside the
+supported subset (type, class, id and attribute selectors joined by
+descendant or child combinators) are still matched with a
+``CSSSelector`` of their own.
+
+`visible_text` reads an element's text without its <script> and <style>
+descendants, leaving the tree untouched for the resolvers that come
+after.
+"""
+import cssselect
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+_VISIBLE_TEXT = etree.XPath('descendant::text()[not(ancestor::script) and not(ancestor::style)]',
+                            smart_strings=False)
+
+
+class _Compound:
+    """A compound selector such as ``div.byline[data-module="Attribution"]``."""
+
+    __slots__ = ('tag', 'id', 'classes', 'attributes')
+
+    def __init__(self):
+        self.tag = None
+        self.id = None
+        self.classes = set()
+        self.attributes = []  # (name, operator, value)
+
+    def matches(self, elem):
+        if self.tag is not None and elem.tag != self.tag:
+            return False
+        if self.id is not None and elem.get('id') != self.id:
+            return False
+        if self.classes and not self.classes.issubset((elem.get('class') or '').split()):
+            return False
+        for name, operator, value in self.attributes:
+            actual = elem.get(name)
+            if actual is None:
+                return False
+            if operator == '=' and actual != value:
+                return False
+            if operator == '~=' and value not in actual.split():
+                return False
+            if operator == '|=' and actual != value and not actual.startswith(value + '-'):
+                return False
+            if operator == '^=' and not (value and actual.startswith(value)):
+                return False
+            if operator == '$=' and not (value and actual.endswith(value)):
+                return False
+            if operator == '*=' and not (value and value in actual):
+                return False
+        return True
+
+
+def _compile_compound(tree, compound):
+    """Fill *compound* from a cssselect parse tree; return False if it uses unsupported features."""
+    while not isinstance(tree, cssselect.parser.Element):
+        if isinstance(tree, cssselect.parser.Class):
+            compound.classes.add(tree.class_name)
+        elif isinstance(tree, cssselect.parser.Hash):
+            compound.id = tree.id
+        elif isinstance(tree, cssselect.parser.Attrib) and tree.namespace is None and \
+                tree.operator in ('exists', '=', '~=', '|=', '^=', '$=', '*='):
+            value = getattr(tree.value, 'value', tree.value)
+            compound.attributes.append((tree.attrib, tree.operator, value))
+        else:  # pseudo-classes, :not(), namespaced attributes
+            return False
+        tree = tree.selector
+    if tree.namespace is not None:
+        return False
+    if tree.element not in (None, '*'):
+        compound.tag = tree.element
+    return True
+
+
+def _compile(selector):
+    """Return the selector as ``[(compound, combinator), ...]`` from the right, or None if unsupported.
+
+    Each combinator joins its compound to the previous one in the list (to its right).
+    """
+    parsed = cssselect.parse(selector)
+    if len(parsed) != 1 or parsed[0].pseudo_element:
+        return None
+    tree, chain, combinator = parsed[0].parsed_tree, [], None
+    while True:
+        if isinstance(tree, cssselect.parser.CombinedSelector):
+            if tree.combinator not in (' ', '>'):
+                return None
+            compound, left = _Compound(), tree.selector
+            if not _compile_compound(tree.subselector, compound):
+                return None
+            chain.append((compound, combinator))
+            combinator, tree = tree.combinator, left
+        else:
+            compound = _Compound()
+            if not _compile_compound(tree, compound):
+                return None
+            chain.append((compound, combinator))
+            return chain
+
+
+def _matches_chain(chain, elem, position=0):
+    compound, _ = chain[position]
+    if not compound.matches(elem):
+        return False
+    if position + 1 == len(chain):
+        return True
+    combinator = chain[position + 1][1]
+    if combinator == '>':
+        parent = elem.getparent()
+        return parent is not None and _matches_chain(chain, parent, position + 1)
+    return any(_matches_chain(chain, ancestor, position + 1) for ancestor in elem.iterancestors())
+
+
+class SelectorSet:
+    """A fixed list of CSS selectors, matched together in one walk of a document."""
+
+    def __init__(self, selectors):
+        self.selectors = list(dict.fromkeys(selectors))
+        self._known = set(self.selectors)
+        self._by_tag, self._by_class, self._by_id, self._by_attribute = {}, {}, {}, {}
+        self._universal = []
+        self._fallback = {}  # selector -> CSSSelector, for the unsupported ones
+        anchors = 0
+        for selector in self.selectors:
+            chain = _compile(selector)
+            if chain is None:
+                self._fallback[selector] = CSSSelector(selector)
+                continue
+            anchor = None
+            if len(chain) > 1:
+                # An element matching the leftmost compound must come first (it is an ancestor),
+                # so 'header .logo' isn't checked against ancestors until a <header> has been seen
+                anchor, anchors = anchors, anchors + 1
+                self._file(chain[-1][0], (None, [(chain[-1][0], None)], anchor))
+            self._file(chain[0][0], (selector, chain, anchor))
+        self._attribute_names = tuple(self._by_attribute)
+
+    def _file(self, compound, entry):
+        # Under whatever the compound is most selective on
+        if compound.id is not None:
+            self._by_id.setdefault(compound.id, []).append(entry)
+        elif compound.classes:
+            self._by_class.setdefault(min(compound.classes), []).append(entry)
+        elif compound.attributes:
+            self._by_attribute.setdefault(compound.attributes[0][0], []).append(entry)
+        elif compound.tag is not None:
+            self._by_tag.setdefault(compound.tag, []).append(entry)
+        else:
+            self._universal.append(entry)
+
+    def match(self, doc):
+        """Return a dict of each selector's first match in *doc* (selectors with none are left out)."""
+        found, anchors_seen = {}, set()
+        remaining = len(self.selectors) - len(self._fallback)
+        by_tag, by_class, by_id, by_attribute = self._by_tag, self._by_class, self._by_id, self._by_attribute
+        for elem in doc.iter(etree.Element):
+            candidates = []
+            if elem.tag in by_tag:
+                candidates += by_tag[elem.tag]
+            class_attribute = elem.get('class')
+            if class_attribute:
+                # str.split() rather than XPath's split on ASCII whitespace; class
+                # attributes don't hold other whitespace in practice
+                for class_name in class_attribute.split():
+                    if class_name in by_class:
+                        candidates += by_class[class_name]
+            if by_id:
+                elem_id = elem.get('id')
+                if elem_id in by_id:
+                    candidates += by_id[elem_id]
+            for name in self._attribute_names:
+                if elem.get(name) is not None:
+                    candidates += by_attribute[name]
+            candidates += self._universal
+            for selector, chain, anchor in candidates:
+                if selector is None:
+                    if anchor not in anchors_seen and chain[0][0].matches(elem):
+                        anchors_seen.add(anchor)
+                elif selector not in found and (anchor is None or anchor in anchors_seen) \
+                        and _matches_chain(chain, elem):
+                    found[selector] = elem
+                    remaining -= 1
+            if not remaining:
+                break
+        for selector, compiled in self._fallback.items():
+            matches = compiled(doc)
+            if matches:
+                found[selector] = matches[0]
+        return found
+
+    def matcher(self, doc):
+        """Return a SelectorMatches for *doc*, which walks it on first use."""
+        return SelectorMatches(self, doc)
+
+
+class SelectorMatches:
+    """The first match of each selector of a SelectorSet in one document, found on first lookup."""
+
+    def __init__(self, selector_set, doc):
+        self.selector_set = selector_set
+        self.doc = doc
+        self._found = None
+
+    def first(self, selector):
+        """Return the first element matching *selector*, or None.
+
+        Selectors that aren't part of the set are matched on their own.
+        """
+        if self._found is None:
+            self._found = self.selector_set.match(self.doc)
+        if selector in self._found or selector in self.selector_set._known:
+            return self._found.get(selector)
+        matches = CSSSelector(selector)(self.doc)
+        self._found[selector] = matches[0] if matches else None
+        return self._found[selector]
+
+
+def visible_text(elem):
+    """Return the text of *elem* without its <script> and <style> contents, whitespace collapsed."""
+    return ' '.join(''.join(_VISIBLE_TEXT(elem)).split())
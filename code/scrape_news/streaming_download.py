@@ -0,0 +1,147 @@
+"""Bounded, streaming download of response bodies for scrape-news.py.
+
+``requests`` normally reads and decompresses the whole body before the
+caller sees it, so a multi-megabyte page full of inline assets, or an
+infinite-scroll endpoint that never ends, is held in memory in full.
+`read_body` instead reads the raw (still compressed) stream in chunks,
+decompresses each chunk as it arrives and stops at a byte cap. It can
+also stop as soon as the page's <head> and its first complete <article>
+have arrived, since nothing after that is used for extraction.
+"""
+import re
+import zlib
+
+import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+
+CHUNK_SIZE = 64 * 1024
+
+# Checked against the decoded HTML as it streams in
+_HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
+_ARTICLE_END = re.compile(rb'</article\s*>', re.IGNORECASE)
+_LD_JSON_OPEN = re.compile(rb'<script[^>]+application/ld\+json[^>]*>', re.IGNORECASE)
+_SCRIPT_CLOSE = re.compile(rb'</script\s*>', re.IGNORECASE)
+
+# How far back each search looks so that a tag split across two chunks is still found
+_OVERLAP = 64
+
+
+class _ZlibDecoder:
+    """Incremental gzip/deflate decoder with bounded output per step."""
+
+    def __init__(self, encoding):
+        # 16 + MAX_WBITS expects a gzip header; deflate normally carries a zlib header
+        self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+        self._raw_deflate_fallback = encoding == 'deflate'
+
+    def decode(self, data, max_length=0):
+        try:
+            return self._decoder.decompress(data, max_length)
+        except zlib.error:
+            if not self._raw_deflate_fallback:
+                raise
+            # Some servers send "deflate" without the zlib header
+            self._raw_deflate_fallback = False
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(data, max_length)
+
+    @property
+    def unconsumed(self):
+        return self._decoder.unconsumed_tail
+
+
+def _decoder_for(encoding):
+    """Return our decoder for Content-Encoding *encoding*, or None to let urllib3 decode."""
+    encoding = (encoding or '').strip().lower()
+    if encoding in ('gzip', 'x-gzip'):
+        return _ZlibDecoder('gzip')
+    if encoding == 'deflate':
+        return _ZlibDecoder('deflate')
+    return None
+
+
+class _ArticleWatch:
+    """Tells when the <head>, the first </article> and any open JSON-LD block have arrived.
+
+    Only the newly received part of the body is searched on each call.
+    """
+
+    def __init__(self):
+        self._scanned = 0
+        self._head_done = False
+        self._article_done = False
+        self._ld_json_pos = 0
+        self._in_ld_json = False
+
+    def complete(self, body):
+        start = max(0, self._scanned - _OVERLAP)
+        self._scanned = len(body)
+        if not self._head_done:
+            self._head_done = _HEAD_END.search(body, start) is not None
+        if self._head_done and not self._article_done:
+            self._article_done = _ARTICLE_END.search(body, start) is not None
+
+        # Follow JSON-LD blocks so a body block isn't cut in half
+        pos = max(start, self._ld_json_pos)
+        while True:
+            match = (_SCRIPT_CLOSE if self._in_ld_json else _LD_JSON_OPEN).search(body, pos)
+            if match is None:
+                break
+            self._in_ld_json = not self._in_ld_json
+            pos = self._ld_json_pos = match.end()
+        return self._head_done and self._article_done and not self._in_ld_json
+
+
+def read_body(response, max_bytes=None, stop_after_article=False):
+    """Read the body of the streamed *response* (``stream=True``).
+
+    At most *max_bytes* of decoded body are kept. With *stop_after_article*
+    reading ends once the <head> and the first </article> have arrived.
+    The body is stored on the response, so ``response.content`` works as
+    usual afterwards. Returns ``(body, stopped)`` where *stopped* is None
+    when the whole body was read, ``'size cap'`` (only if more than
+    *max_bytes* arrived) or ``'article complete'``.
+    Read and decoding errors are raised as the same requests exceptions
+    ``response.content`` would raise.
+    """
+    decoder = _decoder_for(response.headers.get('Content-Encoding'))
+    watch = _ArticleWatch() if stop_after_article else None
+    body = bytearray()
+    stopped = None
+    # Read one byte past the cap: a body that fills it exactly isn't truncated
+    limit = max_bytes + 1 if max_bytes else None
+
+    # With our own decoder read the compressed bytes, otherwise let urllib3 decode them
+    chunks = response.raw.stream(CHUNK_SIZE, decode_content=decoder is None)
+    try:
+        for chunk in chunks:
+            if decoder is not None:
+                # Bound the output of each step so a small compressed chunk can't expand without limit
+                body += decoder.decode(chunk, limit - len(body) if limit else 0)
+                while decoder.unconsumed and not (limit and len(body) >= limit):
+                    body += decoder.decode(decoder.unconsumed, limit - len(body) if limit else 0)
+            else:
+                body += chunk
+            if limit and len(body) >= limit:
+                del body[max_bytes:]
+                stopped = 'size cap'
+                break
+            if watch is not None and watch.complete(body):
+                stopped = 'article complete'
+                break
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except (DecodeError, zlib.error) as e:
+        raise requests.exceptions.ContentDecodingError(e)
+    finally:
+        # Hands a fully read connection back to the pool; a partly read one is closed
+        response.close()
+
+    body = bytes(body)
+    response._content = body
+    response._content_consumed = True
+    if decoder is not None and 'Content-Encoding' in response.headers:
+        del response.headers['Content-Encoding']
+    return body, stopped
@@ -0,0 +1,7 @@
+"""Query tool for the full-text article index (see scrape_news/search_index.py)."""
+import sys
+
+from scrape_news.search_index import main
+
+if __name__ == '__main__':
+    sys.exit(main())